@@ -9,7 +9,7 @@ from freqtrade.strategy import IStrategy, IntParameter, DecimalParameter
 from freqtrade.strategy.parameters import CategoricalParameter
 from freqtrade.persistence import Trade
 from freqtrade.exchange import timeframe_to_minutes
-from .indicators import calculate_all_indicators
+from .indicators import calculate_all_indicators_cached
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -91,8 +91,21 @@ class NewsHeliusBitqueryML(IStrategy):
         "trailing_only_offset_is_reached": True
     }
 
+    def __init__(self, config: dict = None) -> None:
+        super().__init__(config)
+        # ROI-расписание один раз переводим в отсортированные numpy-массивы,
+        # чтобы custom_roi делал branchless-поиск вместо if/elif лестницы
+        self._roi_thresholds = np.array([0.0, 30.0, 90.0])
+        self._roi_values = np.array([
+            self.roi_params['roi_0'],
+            self.roi_params['roi_30'],
+            self.roi_params['roi_90'],
+        ])
+
     def populate_indicators(self, df: DataFrame, metadata: dict) -> DataFrame:
-        df = calculate_all_indicators(df)
+        # Кэшированный расчёт: на неизменившемся фрейме (hyperopt-эпохи)
+        # индикаторы подставляются из кэша без пересчёта
+        df = calculate_all_indicators_cached(df, pair=metadata.get("pair", ""))
         for c in ["macd", "macd_sig", "rsi", "atr", "ema50", "ema200"]:
             if c in df.columns:
                 df[c] = pd.to_numeric(df[c], errors="coerce")
@@ -111,26 +124,24 @@ class NewsHeliusBitqueryML(IStrategy):
         rsi_ok_long  = df["rsi"] > 45
         rsi_ok_short = df["rsi"] < 55
 
-        df["enter_long"]  = (trend_long  & df["vol_ok"] & macd_cross_up   & rsi_ok_long).astype(int)
-        df["enter_short"] = (trend_short & df["vol_ok"] & macd_cross_down & rsi_ok_short).astype(int)
+        df["enter_long"]  = (trend_long  & df["vol_ok"] & macd_cross_up   & rsi_ok_long).astype(np.int8)
+        df["enter_short"] = (trend_short & df["vol_ok"] & macd_cross_down & rsi_ok_short).astype(np.int8)
         return df
 
     def populate_exit_trend(self, df: DataFrame, metadata: dict) -> DataFrame:
-        df["exit_long"]  = ((df["macd"] < df["macd_sig"]) | (df["rsi"] < 50)).astype(int)
-        df["exit_short"] = ((df["macd"] > df["macd_sig"]) | (df["rsi"] > 50)).astype(int)
+        df["exit_long"]  = ((df["macd"] < df["macd_sig"]) | (df["rsi"] < 50)).astype(np.int8)
+        df["exit_short"] = ((df["macd"] > df["macd_sig"]) | (df["rsi"] > 50)).astype(np.int8)
         return df
     
     # Методы для гипероптимизации ROI
     def custom_roi(self, dataframe: DataFrame, trade: Trade, current_time: datetime, **kwargs) -> float:
         # Динамический ROI на основе времени удержания позиции
         open_minutes = (current_time - trade.open_date_utc).total_seconds() / 60
-        
-        if open_minutes <= 30:
-            return self.roi_params['roi_0']
-        elif open_minutes <= 90:
-            return self.roi_params['roi_30']
-        else:
-            return self.roi_params['roi_90']
+
+        # side='left': граница включается в нижнюю ступень (<=30 → roi_0),
+        # как в исходной if/elif лестнице
+        idx = np.searchsorted(self._roi_thresholds, open_minutes, side='left') - 1
+        return float(self._roi_values[max(idx, 0)])
     
     # Методы для гипероптимизации Stoploss
     def custom_stoploss(self, pair: str, trade: Trade, current_time: datetime, current_rate: float, current_profit: float, **kwargs) -> float:
@@ -0,0 +1,25 @@
+"""
+Тонкая обёртка над numba.njit с мягким фолбэком.
+
+Если numba установлена — отдаём настоящие njit/prange, и горячие циклы
+компилируются в машинный код. Если нет — декоратор становится no-op и тот же
+код выполняется чистым Python/NumPy (медленнее, но корректно).
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - зависит от окружения
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        # Поддерживаем обе формы: @njit и @njit(cache=True, ...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def wrapper(func):
+            return func
+
+        return wrapper
+
+    prange = range
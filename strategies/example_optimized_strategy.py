@@ -18,10 +18,31 @@ warnings.filterwarnings("ignore")
 
 # Импортируем наш модуль с индикаторами
 from .indicators import calculate_all_indicators, add_trading_hours_filter
+from ._njit import njit, prange
 
 logger = logging.getLogger(__name__)
 
 
+@njit(cache=True, parallel=True)
+def _long_entry_mask(ema50, ema200, ema_fast, ema_slow, vol_frac, macd, macd_sig,
+                     adx, rsi, tradable, vol_min, rsi_th, adx_min):
+    """
+    Один слитный проход по всем входным массивам вместо семи отдельных
+    булевых масок: каждая маска в pandas/numpy — это ещё один буфер длины N
+    и ещё один проход по памяти.
+    """
+    n = ema50.shape[0]
+    out = np.zeros(n, np.int8)
+    for i in prange(1, n):
+        if (ema50[i] > ema200[i] and ema_fast[i] > ema_slow[i]
+                and vol_frac[i] > vol_min
+                and macd[i] > macd_sig[i] and adx[i] >= adx_min
+                and rsi[i - 1] < rsi_th and rsi[i] >= rsi_th
+                and tradable[i] == 1):
+            out[i] = 1
+    return out
+
+
 class OptimizedIndicatorsStrategy(IStrategy):
     """
     Стратегия с использованием оптимизированных технических индикаторов.
@@ -92,6 +113,14 @@ class OptimizedIndicatorsStrategy(IStrategy):
         "ema_exit_long": True
     }
 
+    def __init__(self, config: dict = None) -> None:
+        super().__init__(config)
+        # Разбираем minimal_roi один раз в отсортированные numpy-массивы
+        # для branchless-поиска в custom_roi
+        roi_items = sorted((int(k), v) for k, v in self.minimal_roi.items())
+        self._roi_thresholds = np.array([float(k) for k, _ in roi_items])
+        self._roi_values = np.array([v for _, v in roi_items])
+
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """
         Рассчитывает все технические индикаторы используя оптимизированный модуль.
@@ -113,22 +142,22 @@ class OptimizedIndicatorsStrategy(IStrategy):
         # Добавляем фильтр торговых часов
         df = add_trading_hours_filter(df, start_hour=6, end_hour=22)
         
-        # Логируем статистику по индикаторам для отладки
-        try:
-            logger.info(f"[DBG] Indicators calculated successfully for {metadata['pair']}")
-            logger.info(f"[DBG] Columns: {list(df.columns)}")
-            logger.info(f"[DBG] Data shape: {df.shape}")
-            
-            # Проверяем наличие NaN значений
-            nan_counts = {}
-            for col in ['ema_fast', 'ema_slow', 'ema50', 'ema200', 'rsi', 'macd', 'macd_sig', 'atr', 'adx', 'vol_frac']:
-                if col in df.columns:
-                    nan_counts[col] = df[col].isna().sum()
-            
-            logger.info(f"[DBG] NaN counts: {nan_counts}")
-            
-        except Exception as e:
-            logger.warning(f"[DBG] Error in indicators debug: {e}")
+        # Отладочная статистика только при включённом DEBUG — в горячем пути
+        # populate_indicators эти проверки дают лишние проходы по всем строкам
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                logger.debug(f"[DBG] Indicators calculated successfully for {metadata['pair']}")
+                logger.debug(f"[DBG] Columns: {list(df.columns)}")
+                logger.debug(f"[DBG] Data shape: {df.shape}")
+
+                # Один проход по всем индикаторным колонкам вместо десяти отдельных
+                dbg_cols = [c for c in ['ema_fast', 'ema_slow', 'ema50', 'ema200', 'rsi',
+                                        'macd', 'macd_sig', 'atr', 'adx', 'vol_frac']
+                            if c in df.columns]
+                logger.debug(f"[DBG] NaN counts: {df[dbg_cols].isna().sum().to_dict()}")
+
+            except Exception as e:
+                logger.warning(f"[DBG] Error in indicators debug: {e}")
         
         return df
 
@@ -141,31 +170,29 @@ class OptimizedIndicatorsStrategy(IStrategy):
         vol_min = self.buy_params['vol_min']
         rsi_long_th = self.buy_params['rsi_long_th']
         adx_min = self.buy_params['adx_min']
-        
-        # Условия для входа в лонг позицию
-        ema_trend_cond = (df['ema50'] > df['ema200'])  # Тренд вверх
-        ema_fast_cond = (df['ema_fast'] > df['ema_slow'])  # Быстрая EMA выше медленной
-        vol_cond = (df['vol_frac'] > vol_min)  # Объем выше среднего
-        macd_cond = (df['macd'] > df['macd_sig'])  # MACD выше сигнальной линии
-        adx_cond = (df['adx'] >= adx_min)  # ADX выше минимального порога
-        rsi_cond = (df['rsi'].shift(1) < rsi_long_th) & (df['rsi'] >= rsi_long_th)  # RSI пересекает порог снизу вверх
-        trading_hours_cond = (df['tradable_hour'] == 1)  # Торговые часы
-        
-        # Комбинируем все условия
-        long_cond = (
-            ema_trend_cond &
-            ema_fast_cond &
-            vol_cond &
-            macd_cond &
-            adx_cond &
-            rsi_cond &
-            trading_hours_cond
+
+        # Извлекаем массивы один раз и отдаём их в слитный njit-проход:
+        # тренд (ema50>ema200, ema_fast>ema_slow), объём, MACD, ADX,
+        # RSI-кросс порога снизу вверх и торговые часы проверяются за один
+        # обход памяти
+        enter_long = _long_entry_mask(
+            df['ema50'].to_numpy(dtype=np.float64),
+            df['ema200'].to_numpy(dtype=np.float64),
+            df['ema_fast'].to_numpy(dtype=np.float64),
+            df['ema_slow'].to_numpy(dtype=np.float64),
+            df['vol_frac'].to_numpy(dtype=np.float64),
+            df['macd'].to_numpy(dtype=np.float64),
+            df['macd_sig'].to_numpy(dtype=np.float64),
+            df['adx'].to_numpy(dtype=np.float64),
+            df['rsi'].to_numpy(dtype=np.float64),
+            df['tradable_hour'].to_numpy(dtype=np.int8),
+            float(vol_min), float(rsi_long_th), float(adx_min),
         )
-        
-        df['enter_long'] = long_cond.astype(int)
-        
+
+        df['enter_long'] = enter_long
+
         # Логируем количество сигналов для отладки
-        signal_count = long_cond.sum()
+        signal_count = int(enter_long.sum())
         if signal_count > 0:
             logger.info(f"[SIGNAL] Found {signal_count} long entry signals for {metadata['pair']}")
         
@@ -179,18 +206,20 @@ class OptimizedIndicatorsStrategy(IStrategy):
         
         rsi_exit_long = self.sell_params['rsi_exit_long']
         ema_exit_long = self.sell_params['ema_exit_long']
-        
-        # Условия для выхода из лонг позиции
-        rsi_exit_cond = (df['rsi'] > rsi_exit_long)  # RSI выше верхнего порога
-        ema_exit_cond = ema_exit_long and (df['close'] < df['ema_fast'])  # Цена ниже быстрой EMA
-        
-        # Комбинируем условия выхода
-        exit_long = rsi_exit_cond | ema_exit_cond
-        
-        df['exit_long'] = exit_long.astype(int)
-        
+
+        # Извлекаем массивы один раз и комбинируем условия чистым numpy
+        rsi = df['rsi'].to_numpy()
+        close = df['close'].to_numpy()
+        ema_fast = df['ema_fast'].to_numpy()
+
+        exit_long = rsi > rsi_exit_long  # RSI выше верхнего порога
+        if ema_exit_long:
+            exit_long |= close < ema_fast  # Цена ниже быстрой EMA
+
+        df['exit_long'] = exit_long.view(np.int8)
+
         # Логируем количество сигналов выхода для отладки
-        exit_count = exit_long.sum()
+        exit_count = int(exit_long.sum())
         if exit_count > 0:
             logger.info(f"[SIGNAL] Found {exit_count} long exit signals for {metadata['pair']}")
         
@@ -201,13 +230,11 @@ class OptimizedIndicatorsStrategy(IStrategy):
         Динамический ROI на основе времени удержания позиции.
         """
         open_minutes = (current_time - trade.open_date_utc).total_seconds() / 60
-        
-        if open_minutes <= 30:
-            return self.minimal_roi["0"]
-        elif open_minutes <= 90:
-            return self.minimal_roi["30"]
-        else:
-            return self.minimal_roi["90"]
+
+        # side='left': граница включается в нижнюю ступень, как в исходной
+        # if/elif лестнице
+        idx = np.searchsorted(self._roi_thresholds, open_minutes, side='left') - 1
+        return float(self._roi_values[max(idx, 0)])
 
     def custom_stoploss(self, pair: str, trade: Trade, current_time: datetime, 
                        current_rate: float, current_profit: float, **kwargs) -> float:
@@ -3,12 +3,68 @@
 Все индикаторы оптимизированы для производительности и точности.
 """
 
+import hashlib
+import logging
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
 from pandas import DataFrame
 
+try:
+    # Пакетный импорт (strategies/), либо плоский (user_data/strategies/)
+    from ._njit import njit, NUMBA_AVAILABLE
+except ImportError:
+    from _njit import njit, NUMBA_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+
+@njit(cache=True, fastmath=True)
+def _emas_multi(close, s_fast, s_slow, s50, s200):
+    """
+    Четыре EMA (fast/slow/50/200) за один проход по close.
+
+    Отдельные .ewm-вызовы прогоняют массив через кэш четыре раза; здесь четыре
+    скалярных аккумулятора обновляются в одном цикле, и close читается однажды.
+
+    Сидирование по соглашению TA-Lib: EMA стартует с SMA первых span значений,
+    более ранние позиции остаются NaN (их поглощает startup_candle_count),
+    поэтому финальный bfill не нужен.
+    """
+    n = close.shape[0]
+    spans = np.array([s_fast, s_slow, s50, s200], dtype=np.int64)
+    alphas = 2.0 / (spans + 1.0)
+    out = np.empty((n, 4))
+    e = np.zeros(4)
+    acc = 0.0
+    for i in range(n):
+        c = close[i]
+        acc += c
+        for k in range(4):
+            if i + 1 < spans[k]:
+                out[i, k] = np.nan
+            elif i + 1 == spans[k]:
+                # acc к этому моменту — сумма первых span значений
+                e[k] = acc / spans[k]
+                out[i, k] = e[k]
+            else:
+                e[k] += alphas[k] * (c - e[k])
+                out[i, k] = e[k]
+    return out
+
+# Колонки, которые производит calculate_all_indicators
+INDICATOR_COLUMNS = ["macd", "macd_sig", "macd_hist", "ema50", "ema200",
+                     "rsi", "atr", "ema_fast", "ema_slow", "adx", "vol_frac"]
+
+# LRU-кэш результатов calculate_all_indicators: во время hyperopt один и тот же
+# OHLCV-фрейм пересчитывается на каждую эпоху, хотя индикаторы не зависят от
+# оптимизируемых порогов входа
+_indicator_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_INDICATOR_CACHE_MAXSIZE = 128
+
 
-def calculate_ema_macd(df: DataFrame, ema_fast_span: int = 12, ema_slow_span: int = 26, macd_signal_span: int = 9) -> DataFrame:
+def calculate_ema_macd(df: DataFrame, ema_fast_span: int = 12, ema_slow_span: int = 26, macd_signal_span: int = 9, _fast: bool = False) -> DataFrame:
     """
     Рассчитывает EMA и MACD индикаторы.
     
@@ -21,7 +77,8 @@ def calculate_ema_macd(df: DataFrame, ema_fast_span: int = 12, ema_slow_span: in
     Returns:
         DataFrame с добавленными колонками: ema_fast, ema_slow, macd, macd_sig, macd_hist
     """
-    df = df.copy()
+    if not _fast:
+        df = df.copy()
     
     # EMA
     ema_fast = df["close"].ewm(span=ema_fast_span, adjust=False).mean()
@@ -39,7 +96,7 @@ def calculate_ema_macd(df: DataFrame, ema_fast_span: int = 12, ema_slow_span: in
     return df
 
 
-def calculate_trend_emas(df: DataFrame) -> DataFrame:
+def calculate_trend_emas(df: DataFrame, _fast: bool = False) -> DataFrame:
     """
     Рассчитывает дополнительные EMA для анализа тренда.
     
@@ -49,7 +106,8 @@ def calculate_trend_emas(df: DataFrame) -> DataFrame:
     Returns:
         DataFrame с добавленными колонками: ema50, ema200
     """
-    df = df.copy()
+    if not _fast:
+        df = df.copy()
     
     df["ema50"] = df["close"].ewm(span=50, adjust=False).mean()
     df["ema200"] = df["close"].ewm(span=200, adjust=False).mean()
@@ -57,7 +115,7 @@ def calculate_trend_emas(df: DataFrame) -> DataFrame:
     return df
 
 
-def calculate_rsi(df: DataFrame, period: int = 14) -> DataFrame:
+def calculate_rsi(df: DataFrame, period: int = 14, _fast: bool = False) -> DataFrame:
     """
     Рассчитывает RSI индикатор с использованием экспоненциального скользящего среднего.
     
@@ -68,7 +126,8 @@ def calculate_rsi(df: DataFrame, period: int = 14) -> DataFrame:
     Returns:
         DataFrame с добавленной колонкой: rsi
     """
-    df = df.copy()
+    if not _fast:
+        df = df.copy()
     
     delta = df["close"].diff()
     gain = delta.clip(lower=0)
@@ -81,7 +140,7 @@ def calculate_rsi(df: DataFrame, period: int = 14) -> DataFrame:
     return df
 
 
-def calculate_atr(df: DataFrame, period: int = 14) -> DataFrame:
+def calculate_atr(df: DataFrame, period: int = 14, _fast: bool = False) -> DataFrame:
     """
     Рассчитывает ATR (Average True Range) индикатор.
     
@@ -92,7 +151,8 @@ def calculate_atr(df: DataFrame, period: int = 14) -> DataFrame:
     Returns:
         DataFrame с добавленной колонкой: atr
     """
-    df = df.copy()
+    if not _fast:
+        df = df.copy()
     
     prev_close = df["close"].shift()
     tr = pd.concat([
@@ -105,7 +165,7 @@ def calculate_atr(df: DataFrame, period: int = 14) -> DataFrame:
     return df
 
 
-def calculate_adx(df: DataFrame, period: int = 14) -> DataFrame:
+def calculate_adx(df: DataFrame, period: int = 14, _fast: bool = False) -> DataFrame:
     """
     Рассчитывает упрощенный ADX индикатор на основе ATR.
     
@@ -116,18 +176,19 @@ def calculate_adx(df: DataFrame, period: int = 14) -> DataFrame:
     Returns:
         DataFrame с добавленной колонкой: adx
     """
-    df = df.copy()
+    if not _fast:
+        df = df.copy()
     
     # Упрощенный ADX на основе ATR
     if 'atr' not in df.columns:
-        df = calculate_atr(df, period)
+        df = calculate_atr(df, period, _fast=_fast)
     
     df['adx'] = df['atr'].rolling(window=period).mean()
     
     return df
 
 
-def calculate_volume_fraction(df: DataFrame, window: int = 20) -> DataFrame:
+def calculate_volume_fraction(df: DataFrame, window: int = 20, _fast: bool = False) -> DataFrame:
     """
     Рассчитывает относительный объем.
     
@@ -138,7 +199,8 @@ def calculate_volume_fraction(df: DataFrame, window: int = 20) -> DataFrame:
     Returns:
         DataFrame с добавленной колонкой: vol_frac
     """
-    df = df.copy()
+    if not _fast:
+        df = df.copy()
     
     df['vol_frac'] = df['volume'] / df['volume'].rolling(window=window).mean()
     
@@ -170,30 +232,85 @@ def calculate_all_indicators(df: DataFrame,
         DataFrame со всеми рассчитанными индикаторами
     """
     df = df.copy()
-    
+
     # Рассчитываем все индикаторы
-    df = calculate_ema_macd(df, ema_fast_span, ema_slow_span, macd_signal_span)
-    df = calculate_trend_emas(df)
-    df = calculate_rsi(df, rsi_period)
-    df = calculate_atr(df, atr_period)
-    df = calculate_adx(df, adx_period)
-    df = calculate_volume_fraction(df, volume_window)
+    if NUMBA_AVAILABLE:
+        # Все четыре EMA по close за один слитный проход
+        emas = _emas_multi(df["close"].to_numpy(dtype=np.float64),
+                           ema_fast_span, ema_slow_span, 50, 200)
+        df["ema_fast"] = emas[:, 0]
+        df["ema_slow"] = emas[:, 1]
+        df["ema50"] = emas[:, 2]
+        df["ema200"] = emas[:, 3]
+        df["macd"] = emas[:, 0] - emas[:, 1]
+        df["macd_sig"] = df["macd"].ewm(span=macd_signal_span, adjust=False).mean()
+        df["macd_hist"] = df["macd"] - df["macd_sig"]
+    else:
+        # Без numba остаёмся на векторных .ewm-вызовах pandas
+        df = calculate_ema_macd(df, ema_fast_span, ema_slow_span, macd_signal_span, _fast=True)
+        df = calculate_trend_emas(df, _fast=True)
+    df = calculate_rsi(df, rsi_period, _fast=True)
+    df = calculate_atr(df, atr_period, _fast=True)
+    df = calculate_adx(df, adx_period, _fast=True)
+    df = calculate_volume_fraction(df, volume_window, _fast=True)
     
     # Подчищаем и убеждаемся, что всё числовое
-    indicator_columns = ["macd", "macd_sig", "macd_hist", "ema50", "ema200", 
-                        "rsi", "atr", "ema_fast", "ema_slow", "adx", "vol_frac"]
-    
-    for col in indicator_columns:
+    for col in INDICATOR_COLUMNS:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
     
-    # Заполняем пропущенные значения
-    df.ffill(inplace=True)
-    df.bfill(inplace=True)
-    
+    # NaN остаются только в warmup-зоне (первые span строк каждого индикатора)
+    # и поглощаются startup_candle_count стратегии — глобальный ffill/bfill
+    # (два прохода по всем колонкам) больше не нужен
+
+    # Храним индикаторы в float32: стратегия сравнивает их с порогами, где
+    # точности float32 достаточно, а памяти и полосы нужно вдвое меньше.
+    # Внутренний расчёт выше остаётся в float64
+    present = [col for col in INDICATOR_COLUMNS if col in df.columns]
+    df[present] = df[present].astype(np.float32)
+
     return df
 
 
+def calculate_all_indicators_cached(df: DataFrame, pair: str = "", **params) -> DataFrame:
+    """
+    Обёртка над calculate_all_indicators с LRU-кэшем по (пара, хэш цен, параметры).
+
+    При повторном вызове на неизменившемся фрейме (типичный случай в hyperopt,
+    когда меняются только пороги входа) готовые массивы индикаторов
+    подставляются в DataFrame без пересчёта.
+
+    Args:
+        df: DataFrame с данными OHLCV
+        pair: Торговая пара (ключ кэша)
+        **params: Параметры, пробрасываемые в calculate_all_indicators
+
+    Returns:
+        DataFrame со всеми рассчитанными индикаторами
+    """
+    close = np.ascontiguousarray(df["close"].to_numpy())
+    # Хэшируем весь ряд close: хвоста недостаточно — фреймы с одинаковым
+    # хвостом, но разной ранней историей давали бы ложный кэш-хит и стейлы
+    # в ema200/ADX/ATR. blake2b по всему массиву — микросекунды на этих длинах.
+    close_hash = hashlib.blake2b(close.tobytes(), digest_size=8).digest()
+    key = (pair, len(df), close_hash, tuple(sorted(params.items())))
+
+    cached = _indicator_cache.get(key)
+    if cached is not None:
+        _indicator_cache.move_to_end(key)
+        result = df.copy()
+        for col, arr in cached.items():
+            result[col] = arr
+        return result
+
+    result = calculate_all_indicators(df, **params)
+    _indicator_cache[key] = {col: result[col].to_numpy()
+                             for col in INDICATOR_COLUMNS if col in result.columns}
+    if len(_indicator_cache) > _INDICATOR_CACHE_MAXSIZE:
+        _indicator_cache.popitem(last=False)
+    return result
+
+
 def add_trading_hours_filter(df: DataFrame, start_hour: int = 6, end_hour: int = 22) -> DataFrame:
     """
     Добавляет фильтр торговых часов.
@@ -207,24 +324,23 @@ def add_trading_hours_filter(df: DataFrame, start_hour: int = 6, end_hour: int =
         DataFrame с добавленной колонкой: tradable_hour
     """
     df = df.copy()
-    
-    # Определяем час для каждой свечи
+
+    # Определяем час для каждой свечи чистым numpy (без .dt-диспатча):
+    # datetime64[ns] -> datetime64[h] -> int64 % 24 — один проход по массиву
     if 'date' in df.columns:
-        hours = df['date'].dt.hour
+        dt64 = df['date'].values
+    elif isinstance(df.index, pd.DatetimeIndex):
+        dt64 = df.index.values
     else:
-        # Используем индекс как datetime
-        try:
-            if isinstance(df.index, pd.DatetimeIndex):
-                hours = df.index.hour
-            else:
-                # Если индекс не datetime, создаем временную метку
-                hours = pd.Series([pd.Timestamp.now().hour] * len(df), index=df.index)
-        except:
-            # Если не получается, используем текущее время
-            hours = pd.Series([pd.Timestamp.now().hour] * len(df), index=df.index)
-    
-    # Создаем булев массив и конвертируем в int
-    tradable_condition = (hours >= start_hour) & (hours <= end_hour)
-    df['tradable_hour'] = tradable_condition.astype(int)
-    
+        # Нет источника времени — помечаем все свечи неторгуемыми
+        logger.warning("add_trading_hours_filter: нет колонки 'date' и datetime-индекса, "
+                       "tradable_hour выставлен в 0")
+        df['tradable_hour'] = np.zeros(len(df), dtype=np.int8)
+        return df
+
+    hours = dt64.astype('datetime64[h]').astype(np.int64) % 24
+
+    # bool -> int8 через view: без копии и в 8 раз компактнее int64
+    df['tradable_hour'] = ((hours >= start_hour) & (hours <= end_hour)).view(np.int8)
+
     return df
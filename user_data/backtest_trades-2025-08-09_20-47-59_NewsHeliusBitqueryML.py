@@ -1,5 +1,6 @@
 from freqtrade.strategy.interface import IStrategy
 from pandas import DataFrame
+import numpy as np
 import pandas as pd
 
 class NewsHeliusBitqueryML(IStrategy):
@@ -33,32 +34,50 @@ class NewsHeliusBitqueryML(IStrategy):
         down = (-delta.clip(upper=0))
         ma_up = up.ewm(alpha=1/length, adjust=False, min_periods=length).mean()
         ma_down = down.ewm(alpha=1/length, adjust=False, min_periods=length).mean()
-        rs = ma_up / (ma_down.replace(0, 1e-9))
-        return 100 - (100 / (1 + rs))
+        # Защита от нулевого знаменателя без Series.replace: replace копирует
+        # весь столбец, np.where делает то же за один numpy-проход
+        mu = ma_up.to_numpy()
+        md = ma_down.to_numpy()
+        rsi = 100.0 - 100.0 / (1.0 + mu / np.where(md == 0.0, 1e-9, md))
+        return pd.Series(rsi, index=series.index)
 
     @staticmethod
     def _atr(df: DataFrame, length: int = 14) -> pd.Series:
-        high, low, close = df['high'], df['low'], df['close']
-        tr = pd.concat([
-            (high - low),
-            (high - close.shift()).abs(),
-            (low - close.shift()).abs()
-        ], axis=1).max(axis=1)
-        return tr.ewm(alpha=1/length, adjust=False, min_periods=length).mean()
+        # True Range чистым numpy: без временного N x 3 DataFrame от pd.concat
+        # и медленной построчной редукции max(axis=1)
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        close = df['close'].to_numpy(dtype=float)
+        prev_close = np.empty_like(close)
+        prev_close[0] = np.nan
+        prev_close[1:] = close[:-1]
+        # np.fmax пропускает NaN первой строки — как max(axis=1) со skipna
+        tr = np.fmax(high - low,
+                     np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        return pd.Series(tr, index=df.index).ewm(alpha=1/length, adjust=False, min_periods=length).mean()
 
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
-        df = dataframe.copy()
+        # Работаем прямо с dataframe: .copy() дублировал все OHLCV-блоки,
+        # а fillna/dropna по всему фрейму делали ещё два полных прохода
+        df = dataframe
         df['ema_fast'] = self._ema(df['close'], 50)
         df['ema_slow'] = self._ema(df['close'], 200)
         df['rsi'] = self._rsi(df['close'], 14)
         df['atr'] = self._atr(df, 14)
         df['vol_frac'] = (df['atr'] / df['close']).fillna(0)
 
-        hours = df['date'].dt.hour if 'date' in df.columns else df.index.tz_convert('UTC').hour
-        df['tradable_hour'] = ((hours >= 0) & (hours <= 23)).astype(int)
+        # Часы как int8 через целочисленную арифметику над datetime64 —
+        # без полного datetime-аксессора .dt.hour по всем строкам
+        if 'date' in df.columns:
+            hours = (df['date'].to_numpy(dtype='datetime64[h]').astype('int64') % 24).astype('int8')
+        else:
+            hours = df.index.tz_convert('UTC').hour.to_numpy().astype('int8')
+        df['tradable_hour'] = ((hours >= 0) & (hours <= 23)).astype('int8')
 
-        df.fillna(method="ffill", inplace=True)
-        df.dropna(inplace=True)
+        # NaN только в разгоне min_periods у rsi/atr — тянем лишь эти колонки;
+        # остаточный NaN в начале поглощается startup_candle_count
+        for col in ('rsi', 'atr'):
+            df[col] = df[col].ffill()
         return df
 
     def populate_entry_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
@@ -1,4 +1,5 @@
 import logging
+from collections import OrderedDict
 from typing import Dict
 
 import numpy as np
@@ -7,9 +8,146 @@ from pandas import DataFrame
 
 from freqtrade.strategy import IStrategy, IntParameter, DecimalParameter
 
+from _njit import njit, NUMBA_AVAILABLE
+
 
 logger = logging.getLogger(__name__)
 
+# Явные сигнатуры njit-ядер: компиляция на декорировании при импорте модуля
+# (с персистентным кэшем numba), а не на первом вызове. Входные массивы
+# объявлены readonly — pandas .to_numpy() отдаёт readonly-вьюхи.
+if NUMBA_AVAILABLE:
+    from numba import types as _nt
+
+    _f4 = _nt.Array(_nt.float32, 1, "C")
+    _b1 = _nt.Array(_nt.boolean, 1, "C")
+    _f8_ro = _nt.Array(_nt.float64, 1, "A", readonly=True)
+    _SIG_QUANTILE = _f4(_f8_ro, _nt.int64, _nt.float64)
+    _SIG_EMA = _f4(_f8_ro, _nt.int64)
+    _SIG_ATR = _f4(_f8_ro, _f8_ro, _f8_ro, _nt.int64)
+    _SIG_KC_CROSS = _nt.UniTuple(_b1, 2)(_f8_ro, _f8_ro, _f8_ro)
+else:  # pragma: no cover - без numba декоратор no-op, сигнатуры не нужны
+    _SIG_QUANTILE = _SIG_EMA = _SIG_ATR = _SIG_KC_CROSS = None
+
+
+class _IndicatorCache:
+    """
+    LRU-кэш индикаторных массивов по ключу (пара, последняя свеча, сигнатура).
+
+    В hyperopt populate_indicators пересчитывается на каждую эпоху на
+    неизменном OHLCV; колонки, не зависящие от перебираемых параметров,
+    достаются из кэша за O(1).
+    """
+
+    def __init__(self, maxsize: int = 64) -> None:
+        self._data: OrderedDict = OrderedDict()
+        self._maxsize = maxsize
+
+    def get_or_compute(self, key, fn):
+        hit = self._data.get(key)
+        if hit is not None:
+            self._data.move_to_end(key)
+            return hit
+        val = fn()
+        self._data[key] = val
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+        return val
+
+
+_indicator_cache = _IndicatorCache()
+
+
+@njit(_SIG_QUANTILE, cache=True)
+def _rolling_quantile_njit(x, win, q):
+    """
+    Скользящий квантиль на инкрементально поддерживаемом отсортированном окне.
+
+    pandas rolling().quantile() пересортировывает каждое окно (O(W log W) на
+    шаг); здесь окно сортируется один раз, а дальше старое значение удаляется
+    и новое вставляется через searchsorted + сдвиг (O(W) memmove в худшем
+    случае, O(log W) поиск). Интерполяция линейная, как у pandas.
+    """
+    n = x.shape[0]
+    out = np.full(n, np.nan, np.float32)
+    if n < win:
+        return out
+    window = np.sort(x[:win].copy())
+    pos = q * (win - 1)
+    lo = int(pos)
+    hi = lo if lo == win - 1 else lo + 1
+    frac = pos - lo
+    out[win - 1] = window[lo] + (window[hi] - window[lo]) * frac
+    for i in range(win, n):
+        old = x[i - win]
+        new = x[i]
+        j = np.searchsorted(window, old)
+        k = np.searchsorted(window, new)
+        if k > j:
+            for t in range(j, k - 1):
+                window[t] = window[t + 1]
+            window[k - 1] = new
+        else:
+            for t in range(j, k, -1):
+                window[t] = window[t - 1]
+            window[k] = new
+        out[i] = window[lo] + (window[hi] - window[lo]) * frac
+    return out
+
+
+@njit(_SIG_EMA, cache=True, fastmath=True)
+def _ema_njit(x, span):
+    """EMA с alpha = 2/(span+1) и сидированием x[0] — как ewm(adjust=False)."""
+    n = x.shape[0]
+    out = np.empty(n, np.float32)
+    alpha = 2.0 / (span + 1.0)
+    e = x[0]
+    out[0] = e
+    for i in range(1, n):
+        e += alpha * (x[i] - e)
+        out[i] = e
+    return out
+
+
+@njit(_SIG_ATR, cache=True, fastmath=True)
+def _atr_wilder_njit(high, low, close, period):
+    """
+    True Range и Уайлдер-EMA в одном проходе: без четырёх временных массивов
+    (три компоненты TR + их максимум), которые строила pandas-версия.
+    """
+    n = high.shape[0]
+    out = np.empty(n, np.float32)
+    out[0] = np.nan
+    alpha = 1.0 / period
+    atr = 0.0
+    seeded = False
+    for i in range(1, n):
+        tr = max(high[i] - low[i],
+                 abs(high[i] - close[i - 1]),
+                 abs(low[i] - close[i - 1]))
+        if not seeded:
+            atr = tr
+            seeded = True
+        else:
+            atr += alpha * (tr - atr)
+        out[i] = atr
+    return out
+
+
+@njit(_SIG_KC_CROSS, cache=True)
+def _kc_cross_njit(close, kc_lower, kc_upper):
+    """
+    Оба пересечения лент Keltner за один проход без shift-массивов:
+    long — возврат внутрь через нижнюю ленту, short — через верхнюю.
+    """
+    n = close.shape[0]
+    long_mask = np.zeros(n, np.bool_)
+    short_mask = np.zeros(n, np.bool_)
+    for i in range(1, n):
+        long_mask[i] = close[i - 1] < kc_lower[i - 1] and close[i] > kc_lower[i]
+        short_mask[i] = close[i - 1] > kc_upper[i - 1] and close[i] < kc_upper[i]
+    return long_mask, short_mask
+
 
 class IntradayScalp5m(IStrategy):
     timeframe = "5m"
@@ -91,61 +229,90 @@ class IntradayScalp5m(IStrategy):
     # Индикаторы
     # -----------------
     def populate_indicators(self, df: DataFrame, metadata: Dict) -> DataFrame:
-        # EMA20 (центральная линия Keltner)
-        df["ema20"] = df["close"].ewm(span=20, adjust=False).mean()
-
-        # ATR(14)
-        prev_close = df["close"].shift(1)
-        tr = np.maximum(
-            df["high"] - df["low"],
-            np.maximum((df["high"] - prev_close).abs(), (df["low"] - prev_close).abs()),
-        )
-        df["atr"] = tr.ewm(alpha=1 / 14, adjust=False).mean()
-        df["atr_pct"] = df["atr"] / df["close"]
+        pair = metadata.get("pair", "") if isinstance(metadata, dict) else ""
+        last_ts = int(df["date"].iloc[-1].value) if ("date" in df.columns and len(df)) else 0
+
+        # SoA: столбцы OHLCV выдёргиваем в ndarray один раз, результаты копим
+        # в out и присваиваем единым df.assign в конце
+        close_arr = df["close"].to_numpy(dtype=np.float64)
+        high_arr = df["high"].to_numpy(dtype=np.float64)
+        low_arr = df["low"].to_numpy(dtype=np.float64)
+        volume_arr = df["volume"].to_numpy(dtype=np.float64)
+        out = {}
+
+        def _compute_base():
+            return {
+                "ema20": _ema_njit(close_arr, 20),
+                "atr": _atr_wilder_njit(high_arr, low_arr, close_arr, 14),
+            }
+
+        # EMA20 (центральная линия Keltner) и ATR(14) не зависят от
+        # перебираемых параметров — берём из LRU-кэша
+        base = _indicator_cache.get_or_compute(
+            (pair, last_ts, len(df), "ema20_atr14"), _compute_base)
+        ema20 = base["ema20"]
+        atr = base["atr"]
+        out["ema20"] = ema20
+        out["atr"] = atr
+        out["atr_pct"] = (atr / close_arr).astype(np.float32)
 
         # Keltner Channels
         atr_mult_val = float(self.atr_mult.value)
-        df["kc_upper"] = df["ema20"] + atr_mult_val * df["atr"]
-        df["kc_lower"] = df["ema20"] - atr_mult_val * df["atr"]
+        out["kc_upper"] = ema20 + atr_mult_val * atr
+        out["kc_lower"] = ema20 - atr_mult_val * atr
 
-        # Объёмный перцентиль (rolling quantile)
+        # Объёмный перцентиль: инкрементальное отсортированное окно вместо
+        # пересортировки каждого окна в pandas rolling().quantile()
+        # (min_periods=win сохранён: до заполнения окна — NaN)
         win = int(self.vol_q_window.value)
         q = float(self.vol_q_thres.value)
-        # Используем min_periods=win для стабильности порога
-        df["vol_q"] = df["volume"].rolling(win, min_periods=win).quantile(q)
-        df["vol_ok"] = (df["volume"] >= df["vol_q"]).astype(int)
+        vol_q = _indicator_cache.get_or_compute(
+            (pair, last_ts, len(df), "vol_q", win, q),
+            lambda: _rolling_quantile_njit(volume_arr, win, q))
+        out["vol_q"] = vol_q
+        out["vol_ok"] = (volume_arr >= vol_q).view(np.int8)
+
+        # Фильтр времени UTC: 07:00–20:00. Часы считаем int64-арифметикой над
+        # datetime64 вместо .dt.hour (полный datetime-аксессор по всем строкам)
+        # и кэшируем: в hyperopt колонка date не меняется между эпохами
+        hours = _indicator_cache.get_or_compute(
+            (pair, last_ts, len(df), "hours"),
+            lambda: (df["date"].to_numpy(dtype="datetime64[h]").astype(np.int64) % 24).astype(np.int8))
+        out["in_session"] = ((hours >= 7) & (hours <= 20)).view(np.int8)
 
-        # Фильтр времени UTC: 07:00–20:00
-        hours = df["date"].dt.hour
-        df["in_session"] = ((hours >= 7) & (hours <= 20)).astype(int)
+        # Единое присваивание всех индикаторных колонок
+        df = df.assign(**out)
 
-        df.replace([np.inf, -np.inf], np.nan, inplace=True)
-        df.ffill(inplace=True)
-        df.bfill(inplace=True)
+        # Без финального replace/ffill/bfill: ядра отдают конечные значения
+        # после разгона, а NaN первых свечей поглощается startup_candle_count
         return df
 
     # -----------------
     # Входы
     # -----------------
     def populate_entry_trend(self, df: DataFrame, metadata: Dict) -> DataFrame:
+        # Branchless-маски на голых numpy-массивах: без Series-временных
+        # на каждое сравнение и без .loc-присваиваний с выравниванием индекса
+        atr_pct = df["atr_pct"].to_numpy(dtype=np.float64)
+        close = df["close"].to_numpy(dtype=np.float64)
+        kc_lower = df["kc_lower"].to_numpy(dtype=np.float64)
+        kc_upper = df["kc_upper"].to_numpy(dtype=np.float64)
+
         # Волатильность в заданном диапазоне
-        vol_ok = (df["atr_pct"] >= float(self.atr_min_pct.value)) & (
-            df["atr_pct"] <= float(self.atr_max_pct.value)
+        vol_ok = (atr_pct >= float(self.atr_min_pct.value)) & (
+            atr_pct <= float(self.atr_max_pct.value)
         )
 
-        base_filters = vol_ok & (df["vol_ok"] == 1) & (df["in_session"] == 1)
-
-        # LONG: выход ниже нижней ленты и возврат внутрь (пересечение снизу-вверх)
-        long_revert = (df["close"].shift(1) < df["kc_lower"].shift(1)) & (df["close"] > df["kc_lower"])
-
-        # SHORT: зеркально по верхней ленте (пересечение сверху-вниз)
-        short_revert = (df["close"].shift(1) > df["kc_upper"].shift(1)) & (df["close"] < df["kc_upper"])
+        base_filters = vol_ok & (df["vol_ok"].to_numpy() == 1) & (df["in_session"].to_numpy() == 1)
 
-        df["enter_long"] = 0
-        df.loc[base_filters & long_revert, "enter_long"] = 1
+        # LONG: возврат внутрь через нижнюю ленту, SHORT: зеркально через
+        # верхнюю — оба пересечения считает один njit-проход без shift-копий
+        long_revert, short_revert = _kc_cross_njit(close, kc_lower, kc_upper)
+        long_revert &= base_filters
+        short_revert &= base_filters
 
-        df["enter_short"] = 0
-        df.loc[base_filters & short_revert, "enter_short"] = 1
+        df["enter_long"] = long_revert.view(np.int8)
+        df["enter_short"] = short_revert.view(np.int8)
         return df
 
     # -----------------
@@ -1,4 +1,5 @@
 import logging
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
@@ -10,16 +11,317 @@ from freqtrade.strategy import (
     IntParameter,
     DecimalParameter,
     CategoricalParameter,
-    merge_informative_pair,
 )
 from freqtrade.persistence import Trade
 from freqtrade.exchange import timeframe_to_minutes
 # from indicators import calculate_all_indicators
+from _njit import njit, prange, NUMBA_AVAILABLE
+try:
+    import bottleneck as bn
+    BN_AVAILABLE = True
+except ImportError:
+    BN_AVAILABLE = False
+try:
+    import numexpr as ne
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+try:
+    from scipy.signal import lfilter
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
 import warnings
 warnings.filterwarnings("ignore")
 
 logger = logging.getLogger(__name__)
 
+
+@njit(cache=True)
+def _ewm_alpha(arr, alpha):
+    """
+    EWMA с adjust=False и сидированием на первом валидном значении.
+    NaN в начале пропускаются, NaN в середине несут вперёд предыдущее
+    значение — это семантика pandas ewm(..., ignore_na=True), НЕ
+    дефолтного ignore_na=False: после внутреннего NaN веса расходятся
+    с pandas. Здесь входы санированы до вызова, поэтому внутренних NaN
+    нет; для произвольных входов с NaN парность с pandas не гарантируется.
+    Без fastmath: он включает nnan и ломает проверки isnan.
+    """
+    n = arr.shape[0]
+    out = np.empty(n)
+    s = 0.0
+    seeded = False
+    for i in range(n):
+        x = arr[i]
+        if not seeded:
+            if np.isnan(x):
+                out[i] = np.nan
+            else:
+                s = x
+                seeded = True
+                out[i] = s
+        else:
+            if not np.isnan(x):
+                s += alpha * (x - s)
+            out[i] = s
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def _compute_indicators(close, high, low):
+    """
+    Слитный расчёт EMA50/200, MACD(12,26,9), RSI(14) Уайлдера, ATR(14) и
+    ATR% за один проход по close/high/low: семь отдельных ewm-цепочек pandas
+    (каждая — Cython-цикл плюс конструирование Series) заменены одной
+    рекурсией, пока close[i] в регистре. True Range и +DM/-DM возвращаются
+    отдельными массивами: prev_close и диффы high/low считаются здесь один
+    раз и переиспользуются блоком ADX вместо повторных shift/diff.
+    """
+    n = close.shape[0]
+    ema_fast = np.empty(n)
+    ema_slow = np.empty(n)
+    macd = np.empty(n)
+    macd_sig = np.empty(n)
+    macd_hist = np.empty(n)
+    rsi = np.empty(n)
+    atr = np.empty(n)
+    atr_pct = np.empty(n)
+    tr_out = np.empty(n)
+    pdm_out = np.empty(n)
+    mdm_out = np.empty(n)
+    a50 = 2.0 / 51.0
+    a200 = 2.0 / 201.0
+    a12 = 2.0 / 13.0
+    a26 = 2.0 / 27.0
+    a9 = 2.0 / 10.0
+    w = 1.0 / 14.0
+    ef = es = e12 = e26 = close[0]
+    sig = 0.0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    rsi_seeded = False
+    atr_v = 0.0
+    atr_seeded = False
+    ema_fast[0] = ef
+    ema_slow[0] = es
+    macd[0] = 0.0
+    macd_sig[0] = 0.0
+    macd_hist[0] = 0.0
+    rsi[0] = 50.0
+    atr[0] = np.nan
+    atr_pct[0] = np.nan
+    # первая строка TR без prev_close — как max(axis=1) со skipna;
+    # у +DM/-DM первый дифф не определён -> 0, как np.where над NaN
+    tr_out[0] = high[0] - low[0]
+    pdm_out[0] = 0.0
+    mdm_out[0] = 0.0
+    for i in range(1, n):
+        c = close[i]
+        ef += a50 * (c - ef)
+        es += a200 * (c - es)
+        ema_fast[i] = ef
+        ema_slow[i] = es
+        e12 += a12 * (c - e12)
+        e26 += a26 * (c - e26)
+        m = e12 - e26
+        sig += a9 * (m - sig)
+        macd[i] = m
+        macd_sig[i] = sig
+        macd_hist[i] = m - sig
+        d = c - close[i - 1]
+        g = d if d > 0.0 else 0.0
+        l = -d if d < 0.0 else 0.0
+        if not rsi_seeded:
+            avg_gain = g
+            avg_loss = l
+            rsi_seeded = True
+        else:
+            avg_gain += w * (g - avg_gain)
+            avg_loss += w * (l - avg_loss)
+        # при avg_loss == 0 pandas давал rs=NaN -> fillna(50)
+        rsi[i] = 50.0 if avg_loss == 0.0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        pc = close[i - 1]
+        tr = max(high[i] - low[i], abs(high[i] - pc), abs(low[i] - pc))
+        tr_out[i] = tr
+        if not atr_seeded:
+            atr_v = tr
+            atr_seeded = True
+        else:
+            atr_v += w * (tr - atr_v)
+        atr[i] = atr_v
+        v = atr_v / c
+        atr_pct[i] = v if v > 0.0 else 0.0
+        up = high[i] - high[i - 1]
+        dn = low[i - 1] - low[i]
+        pdm_out[i] = up if (up > dn and up > 0.0) else 0.0
+        mdm_out[i] = dn if (dn > up and dn > 0.0) else 0.0
+    return (ema_fast, ema_slow, macd, macd_sig, macd_hist, rsi, atr, atr_pct,
+            tr_out, pdm_out, mdm_out)
+
+
+@njit(cache=True, parallel=True)
+def _batch_indicators(closes, highs, lows, offsets, out):
+    """
+    Базовые индикаторы для всех пар вайтлиста за один параллельный проход:
+    ряды упакованы в плоские CSR-массивы (offsets[p]..offsets[p+1] — пара p),
+    рекурсии каждой пары независимы, поэтому prange по парам.
+    """
+    for p in prange(offsets.shape[0] - 1):
+        s = offsets[p]
+        e = offsets[p + 1]
+        (ema_fast, ema_slow, macd, macd_sig, macd_hist,
+         rsi, atr, atr_pct, tr, pdm, mdm) = _compute_indicators(
+            closes[s:e], highs[s:e], lows[s:e])
+        out[0, s:e] = ema_fast
+        out[1, s:e] = ema_slow
+        out[2, s:e] = macd
+        out[3, s:e] = macd_sig
+        out[4, s:e] = macd_hist
+        out[5, s:e] = rsi
+        out[6, s:e] = atr
+        out[7, s:e] = atr_pct
+        out[8, s:e] = tr
+        out[9, s:e] = pdm
+        out[10, s:e] = mdm
+
+
+@lru_cache(maxsize=None)
+def _make_donchian_fn(win):
+    """
+    Специализация Donchian под конкретное значение окна: для каждого
+    собирается своё njit-замыкание, где win — компайл-тайм константа
+    (LLVM разворачивает и векторизует внутреннюю редукцию).
+    maxsize=None: у donch_window 41 возможное значение, и повторная
+    JIT-компиляция вытесненного окна стоит секунды — держим все.
+    cache=False: замыкания numba на диск не кэшируются.
+    """
+    @njit(cache=False, fastmath=True)
+    def donch(high, low):
+        n = high.shape[0]
+        hi = np.full(n, np.nan)
+        lo = np.full(n, np.nan)
+        for i in range(win - 1, n):
+            h = high[i - win + 1]
+            l = low[i - win + 1]
+            for k in range(i - win + 2, i + 1):
+                if high[k] > h:
+                    h = high[k]
+                if low[k] < l:
+                    l = low[k]
+            hi[i] = h
+            lo[i] = l
+        return hi, lo
+    return donch
+
+
+@njit(cache=True)
+def _sanitize_fill_2d(arr):
+    """
+    Санитизация индикаторных колонок на месте за один проход:
+    inf -> NaN -> ffill -> bfill для каждого столбца 2-D буфера — вместо
+    полного df.replace + df.ffill + df.bfill + поколоночного цикла.
+    """
+    n, m = arr.shape
+    for j in range(m):
+        last = np.nan
+        first_valid = -1
+        for i in range(n):
+            x = arr[i, j]
+            if np.isfinite(x):
+                last = x
+                if first_valid < 0:
+                    first_valid = i
+            else:
+                arr[i, j] = last
+        if first_valid > 0:
+            head = arr[first_valid, j]
+            for i in range(first_valid):
+                arr[i, j] = head
+
+
+def _ewm_span(arr, span):
+    """
+    EWMA с adjust=False как первопорядковый IIR-фильтр
+    y[n] = alpha*x[n] + (1-alpha)*y[n-1] через scipy.signal.lfilter:
+    битовая идентичность pandas ewm(span=...).mean() без BlockManager.
+    Для входов с NaN не годится (lfilter их не пропускает) — там _ewm_alpha.
+    """
+    alpha = 2.0 / (span + 1.0)
+    if SCIPY_AVAILABLE:
+        return lfilter([alpha], [1.0, -(1.0 - alpha)], arr,
+                       zi=[(1.0 - alpha) * arr[0]])[0]
+    return _ewm_alpha(arr, alpha)
+
+
+@njit(cache=True)
+def _indicator_state(close, high, low):
+    """
+    Конечные скаляры всех рекурсий (EMA, MACD, RSI, ATR, сглаживания ADX)
+    после полного прохода — сохраняются в self._ind_cache, чтобы на новой
+    свече обновлять только последнюю строку.
+    """
+    n = close.shape[0]
+    a50 = 2.0 / 51.0
+    a200 = 2.0 / 201.0
+    a12 = 2.0 / 13.0
+    a26 = 2.0 / 27.0
+    a9 = 2.0 / 10.0
+    w = 1.0 / 14.0
+    ef = es = e12 = e26 = close[0]
+    sig = 0.0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    atr_v = 0.0
+    atr_seeded = False
+    tr14 = high[0] - low[0]
+    sm_pdm = 0.0
+    sm_mdm = 0.0
+    adx_s = np.nan
+    for i in range(1, n):
+        c = close[i]
+        ef += a50 * (c - ef)
+        es += a200 * (c - es)
+        e12 += a12 * (c - e12)
+        e26 += a26 * (c - e26)
+        m = e12 - e26
+        sig += a9 * (m - sig)
+        d = c - close[i - 1]
+        g = d if d > 0.0 else 0.0
+        l = -d if d < 0.0 else 0.0
+        if i == 1:
+            avg_gain = g
+            avg_loss = l
+        else:
+            avg_gain += w * (g - avg_gain)
+            avg_loss += w * (l - avg_loss)
+        pc = close[i - 1]
+        tr = max(high[i] - low[i], abs(high[i] - pc), abs(low[i] - pc))
+        if not atr_seeded:
+            atr_v = tr
+            atr_seeded = True
+        else:
+            atr_v += w * (tr - atr_v)
+        tr14 += w * (tr - tr14)
+        up = high[i] - high[i - 1]
+        dn = low[i - 1] - low[i]
+        pdm = up if (up > dn and up > 0.0) else 0.0
+        mdm = dn if (dn > up and dn > 0.0) else 0.0
+        sm_pdm += w * (pdm - sm_pdm)
+        sm_mdm += w * (mdm - sm_mdm)
+        if tr14 > 0.0:
+            pdi = 100.0 * sm_pdm / tr14
+            mdi = 100.0 * sm_mdm / tr14
+            s = pdi + mdi
+            if s > 0.0:
+                dx = 100.0 * abs(pdi - mdi) / s
+                if np.isnan(adx_s):
+                    adx_s = dx
+                else:
+                    adx_s += w * (dx - adx_s)
+    return ef, es, e12, e26, sig, avg_gain, avg_loss, atr_v, tr14, sm_pdm, sm_mdm, adx_s
+
+
 class NewsHeliusBitqueryML(IStrategy):
     timeframe = "15m"
     informative_timeframe = "1h"
@@ -86,153 +388,432 @@ class NewsHeliusBitqueryML(IStrategy):
         except Exception:
             # В случаях, когда параметры ещё не инициализированы (например, документация или статический анализ)
             pass
+        self._refresh_params()
+        # Потоковое обновление индикаторов: состояние рекурсий по парам
+        self._ind_cache: dict = {}
+        self._batch_cache: dict = {}
+        self._regime_cache: dict = {}
+        self._tf_ns = int(timeframe_to_minutes(self.timeframe)) * 60 * 1_000_000_000
 
-    def populate_indicators(self, df: DataFrame, metadata: dict) -> DataFrame:
-        # --- EMA(50/200)
-        df["ema_fast"] = df["close"].ewm(span=50, adjust=False).mean()
-        df["ema_slow"] = df["close"].ewm(span=200, adjust=False).mean()
+    def _refresh_params(self) -> None:
+        """
+        Снимок значений параметров в обычные атрибуты: каждый доступ к
+        self.<param>.value проходит через дескриптор, а populate_* дёргают
+        их на каждой паре каждой эпохи гипероптимизации.
+        """
+        try:
+            self._atr_min = float(self.atr_min_pct.value)
+            self._donch_win = int(self.donch_window.value)
+            self._rsi_min_long = int(self.rsi_min_long.value)
+            self._adx_min = int(self.adx_min.value)
+            self._ema_kiss = float(self.ema_kiss_pct.value)
+            self._entry_mode = str(self.entry_mode.value)
+            self._rsi_exit_high = int(self.rsi_exit_high.value)
+        except Exception:
+            self._atr_min = 0.0045
+            self._donch_win = 40
+            self._rsi_min_long = 52
+            self._adx_min = 20
+            self._ema_kiss = 0.0020
+            self._entry_mode = "breakout"
+            self._rsi_exit_high = 68
+
+    def bot_loop_start(self, **kwargs) -> None:
+        # Гипероптимизация подменяет .value между эпохами — обновляем снимок
+        self._refresh_params()
+        # Пакетный предрасчёт по всему вайтлисту: freqtrade дальше зовёт
+        # populate_indicators попарно, и те берут готовые колонки из кэша
+        try:
+            if self.dp is None:
+                return
+            ohlcv = {}
+            for pair in self.dp.current_whitelist():
+                pdf = self.dp.get_pair_dataframe(pair=pair, timeframe=self.timeframe)
+                if pdf is not None and len(pdf) >= 2 and "date" in pdf:
+                    ohlcv[pair] = pdf
+            if len(ohlcv) >= 2:
+                self.compute_all_indicators_batch(ohlcv)
+        except Exception:
+            pass
+
+    def compute_all_indicators_batch(self, ohlcv: Dict[str, DataFrame]) -> None:
+        """
+        CSR-упаковка OHLC всех пар и один prange-проход _batch_indicators;
+        хвостовые колонки (слоупы, Donchian, ADX) досчитываются по парам и
+        складываются в self._batch_cache для populate_indicators.
+        """
+        pairs = list(ohlcv)
+        offsets = np.zeros(len(pairs) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(ohlcv[p]) for p in pairs])
+        total = int(offsets[-1])
+        closes = np.empty(total)
+        highs = np.empty(total)
+        lows = np.empty(total)
+        for i, pair in enumerate(pairs):
+            s, e = int(offsets[i]), int(offsets[i + 1])
+            pdf = ohlcv[pair]
+            closes[s:e] = pdf["close"].to_numpy(dtype=np.float64)
+            highs[s:e] = pdf["high"].to_numpy(dtype=np.float64)
+            lows[s:e] = pdf["low"].to_numpy(dtype=np.float64)
+        base = np.empty((11, total))
+        _batch_indicators(closes, highs, lows, offsets, base)
+        for i, pair in enumerate(pairs):
+            s, e = int(offsets[i]), int(offsets[i + 1])
+            tup = tuple(np.ascontiguousarray(base[k, s:e]) for k in range(11))
+            pdf = ohlcv[pair]
+            out = self._full_compute(pdf, pair, base=tup)
+            self._batch_cache[pair] = {
+                "last_ts": int(pdf["date"].iloc[-1].value),
+                "n": e - s,
+                "out": out,
+            }
+
+    # Колонки, которые ведёт потоковое обновление
+    _STREAM_COLS = (
+        "ema_fast", "ema_slow", "ema_fast_slope", "macd", "macd_sig",
+        "macd_hist", "macd_hist_slope", "rsi", "atr", "atr_pct",
+        "donch_hi", "donch_lo", "adx",
+    )
+
+    def _full_compute(self, df: DataFrame, pair, base=None) -> dict:
+        """Полный пересчёт всех индикаторных колонок + сохранение состояния."""
+        close_arr = df["close"].to_numpy(dtype=np.float64)
+        high_arr = df["high"].to_numpy(dtype=np.float64)
+        low_arr = df["low"].to_numpy(dtype=np.float64)
+        n = close_arr.shape[0]
+
+        # --- EMA(50/200), MACD(12,26,9), RSI(14), ATR(14) — один njit-проход
+        # (или готовый срез из пакетного прохода по всем парам)
+        if base is None:
+            base = _compute_indicators(close_arr, high_arr, low_arr)
+        (ema_fast, ema_slow, macd, macd_sig, macd_hist,
+         rsi, atr, atr_pct, tr, plus_dm, minus_dm) = base
         # Слоупы ЕМА (направление тренда)
-        df["ema_fast_slope"] = df["ema_fast"] - df["ema_fast"].shift(1)
-
-        # --- MACD (12,26,9)
-        macd_fast = df["close"].ewm(span=12, adjust=False).mean()
-        macd_slow = df["close"].ewm(span=26, adjust=False).mean()
-        df["macd"] = macd_fast - macd_slow
-        df["macd_sig"] = df["macd"].ewm(span=9, adjust=False).mean()
-        df["macd_hist"] = df["macd"] - df["macd_sig"]
+        ema_fast_slope = np.empty(n)
+        ema_fast_slope[0] = np.nan
+        ema_fast_slope[1:] = ema_fast[1:] - ema_fast[:-1]
         # Слоуп гистограммы (ускорение)
-        df["macd_hist_slope"] = df["macd_hist"] - df["macd_hist"].shift(1)
-
-        # --- RSI (14) по Уайлдеру
-        delta = df["close"].diff()
-        gain = delta.clip(lower=0)
-        loss = -delta.clip(upper=0)
-        avg_gain = gain.ewm(alpha=1/14, adjust=False).mean()
-        avg_loss = loss.ewm(alpha=1/14, adjust=False).mean()
-        rs = avg_gain / (avg_loss.replace(0, np.nan))
-        df["rsi"] = 100 - (100 / (1 + rs))
-        df["rsi"] = df["rsi"].fillna(50)
-
-        # --- ATR(14) и волатильность
-        prev_close = df["close"].shift(1)
-        tr = np.maximum(df["high"] - df["low"],
-                        np.maximum((df["high"] - prev_close).abs(),
-                                   (df["low"] - prev_close).abs()))
-        df["atr"] = tr.ewm(alpha=1/14, adjust=False).mean()
-        
-        # 1) Расчёт ATR% (диапазон волатильности)
-        df["atr_pct"] = (df["atr"] / df["close"]).clip(lower=0)
-        # Фильтр волатильности: ATR% > заданного минимума
-        df["vol_ok"] = df["atr_pct"] > float(self.atr_min_pct.value)
-        
-        # --- Donchian Channels для breakout режима (по параметру окна)
-        win = int(self.donch_window.value)
-        df["donch_hi"] = df["high"].rolling(win, min_periods=win).max()
-        df["donch_lo"] = df["low"].rolling(win, min_periods=win).min()
+        macd_hist_slope = np.empty(n)
+        macd_hist_slope[0] = np.nan
+        macd_hist_slope[1:] = macd_hist[1:] - macd_hist[:-1]
+
+        # --- Donchian Channels для breakout режима (по параметру окна):
+        # move_max/move_min — монотонная очередь за O(N) вместо generic rolling
+        win = self._donch_win
+        if NUMBA_AVAILABLE:
+            donch_hi, donch_lo = _make_donchian_fn(win)(high_arr, low_arr)
+        elif BN_AVAILABLE:
+            donch_hi = bn.move_max(high_arr, window=win, min_count=win)
+            donch_lo = bn.move_min(low_arr, window=win, min_count=win)
+        else:
+            donch_hi = np.full(n, np.nan)
+            donch_lo = np.full(n, np.nan)
+            if n >= win:
+                donch_hi[win - 1:] = np.lib.stride_tricks.sliding_window_view(
+                    high_arr, win).max(axis=1)
+                donch_lo[win - 1:] = np.lib.stride_tricks.sliding_window_view(
+                    low_arr, win).min(axis=1)
 
         # --- ADX(14) для фильтра силы тренда
-        up_move = df["high"].diff()
-        down_move = -df["low"].diff()
-        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
-        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
-        tr_components = pd.concat([
-            df["high"] - df["low"],
-            (df["high"] - df["close"].shift()).abs(),
-            (df["low"] - df["close"].shift()).abs(),
-        ], axis=1)
-        tr14 = tr_components.max(axis=1).ewm(alpha=1/14, adjust=False).mean()
-        plus_di = 100 * (pd.Series(plus_dm, index=df.index).ewm(alpha=1/14, adjust=False).mean() / tr14)
-        minus_di = 100 * (pd.Series(minus_dm, index=df.index).ewm(alpha=1/14, adjust=False).mean() / tr14)
-        dx = (100 * (plus_di - minus_di).abs() / (plus_di + minus_di)).replace([np.inf, -np.inf], np.nan)
-        df["adx"] = dx.ewm(alpha=1/14, adjust=False).mean().fillna(20)
+        # True Range и +DM/-DM уже посчитаны в _compute_indicators —
+        # диффы high/low один раз за проход, без shift/diff-временных;
+        # сглаживание DM/TR — через _ewm_alpha, без обёрток pd.Series(...).ewm()
+        tr14 = _ewm_alpha(tr, 1 / 14)
+        plus_di = 100.0 * _ewm_alpha(plus_dm, 1 / 14) / tr14
+        minus_di = 100.0 * _ewm_alpha(minus_dm, 1 / 14) / tr14
+        di_sum = plus_di + minus_di
+        # нулевой знаменатель (и NaN от tr14==0) -> NaN, как прежний replace(inf)
+        dx = np.where(di_sum > 0.0, 100.0 * np.abs(plus_di - minus_di) / di_sum, np.nan)
+        adx_raw = _ewm_alpha(dx, 1 / 14)
+        adx = np.where(np.isnan(adx_raw), 20.0, adx_raw)
+
+        # Храним производные колонки во float32: рекурсии считаются во
+        # float64, но в фрейме и в сравнениях populate_entry_trend хватает
+        # одинарной точности, а трафик памяти режется вдвое
+        out = {
+            "ema_fast": ema_fast, "ema_slow": ema_slow,
+            "ema_fast_slope": ema_fast_slope,
+            "macd": macd, "macd_sig": macd_sig, "macd_hist": macd_hist,
+            "macd_hist_slope": macd_hist_slope,
+            "rsi": rsi, "atr": atr, "atr_pct": atr_pct,
+            "donch_hi": donch_hi, "donch_lo": donch_lo, "adx": adx,
+        }
+        out = {name: arr.astype(np.float32) for name, arr in out.items()}
+
+        if pair is not None and n >= 2:
+            (ef, es, e12, e26, sig, avg_gain, avg_loss,
+             atr_v, tr14_s, sm_pdm, sm_mdm, adx_s) = _indicator_state(
+                close_arr, high_arr, low_arr)
+            self._ind_cache[pair] = {
+                "n": n,
+                "last_ts": int(df["date"].iloc[-1].value) if "date" in df else None,
+                "donch_win": win,
+                "close_last": close_arr[-1],
+                "high_last": high_arr[-1],
+                "low_last": low_arr[-1],
+                "ef": ef, "es": es, "e12": e12, "e26": e26, "sig": sig,
+                "avg_gain": avg_gain, "avg_loss": avg_loss, "atr_v": atr_v,
+                "tr14": tr14_s, "sm_pdm": sm_pdm, "sm_mdm": sm_mdm, "adx_s": adx_s,
+                "arrays": dict(out),
+            }
+        return out
+
+    def _stream_update(self, pair, df: DataFrame):
+        """
+        Одношаговое обновление EWMA-рекурсий по закэшированному состоянию:
+        при process_only_new_candles=True новой является только последняя
+        строка, пересчитывать остальные 99.9% незачем. Любое рассогласование
+        (разрыв таймстемпов, скачок длины, смена окна Donchian, несовпадение
+        предпоследнего close) — откат на полный пересчёт.
+        """
+        st = self._ind_cache.get(pair)
+        if st is None or st["last_ts"] is None or "date" not in df:
+            return None
+        if st["donch_win"] != self._donch_win:
+            return None
+        n_new = len(df)
+        if n_new < 2 or n_new not in (st["n"], st["n"] + 1):
+            return None
+        if int(df["date"].iloc[-1].value) - st["last_ts"] != self._tf_ns:
+            return None
+        close = df["close"].to_numpy(dtype=np.float64)
+        high = df["high"].to_numpy(dtype=np.float64)
+        low = df["low"].to_numpy(dtype=np.float64)
+        if close[-2] != st["close_last"]:
+            return None
+
+        c, h, lo_ = close[-1], high[-1], low[-1]
+        pc, ph, pl = st["close_last"], st["high_last"], st["low_last"]
+        w = 1.0 / 14.0
+        prev_ef = st["ef"]
+        prev_hist = st["e12"] - st["e26"] - st["sig"]
+        st["ef"] += (2.0 / 51.0) * (c - st["ef"])
+        st["es"] += (2.0 / 201.0) * (c - st["es"])
+        st["e12"] += (2.0 / 13.0) * (c - st["e12"])
+        st["e26"] += (2.0 / 27.0) * (c - st["e26"])
+        m = st["e12"] - st["e26"]
+        st["sig"] += (2.0 / 10.0) * (m - st["sig"])
+        hist = m - st["sig"]
+        d = c - pc
+        g = d if d > 0.0 else 0.0
+        l = -d if d < 0.0 else 0.0
+        st["avg_gain"] += w * (g - st["avg_gain"])
+        st["avg_loss"] += w * (l - st["avg_loss"])
+        rsi = 50.0 if st["avg_loss"] == 0.0 else \
+            100.0 - 100.0 / (1.0 + st["avg_gain"] / st["avg_loss"])
+        tr = max(h - lo_, abs(h - pc), abs(lo_ - pc))
+        st["atr_v"] += w * (tr - st["atr_v"])
+        atr_pct = max(st["atr_v"] / c, 0.0)
+        st["tr14"] += w * (tr - st["tr14"])
+        up = h - ph
+        dn = pl - lo_
+        pdm = up if (up > dn and up > 0.0) else 0.0
+        mdm = dn if (dn > up and dn > 0.0) else 0.0
+        st["sm_pdm"] += w * (pdm - st["sm_pdm"])
+        st["sm_mdm"] += w * (mdm - st["sm_mdm"])
+        if st["tr14"] > 0.0:
+            pdi = 100.0 * st["sm_pdm"] / st["tr14"]
+            mdi = 100.0 * st["sm_mdm"] / st["tr14"]
+            s = pdi + mdi
+            if s > 0.0:
+                dx = 100.0 * abs(pdi - mdi) / s
+                if np.isnan(st["adx_s"]):
+                    st["adx_s"] = dx
+                else:
+                    st["adx_s"] += w * (dx - st["adx_s"])
+        win = st["donch_win"]
+        new_vals = {
+            "ema_fast": st["ef"], "ema_slow": st["es"],
+            "ema_fast_slope": st["ef"] - prev_ef,
+            "macd": m, "macd_sig": st["sig"], "macd_hist": hist,
+            "macd_hist_slope": hist - prev_hist,
+            "rsi": rsi, "atr": st["atr_v"], "atr_pct": atr_pct,
+            "donch_hi": high[-win:].max() if n_new >= win else np.nan,
+            "donch_lo": low[-win:].min() if n_new >= win else np.nan,
+            "adx": 20.0 if np.isnan(st["adx_s"]) else st["adx_s"],
+        }
+        # Скользящее окно (длина не растёт) или дозапись истории
+        sl = slice(1, None) if n_new == st["n"] else slice(None)
+        prev_arrays = st["arrays"]
+        out = {}
+        for name in self._STREAM_COLS:
+            arr = np.empty(n_new, dtype=np.float32)
+            arr[:-1] = prev_arrays[name][sl]
+            arr[-1] = new_vals[name]
+            out[name] = arr
+        st["arrays"] = dict(out)
+        st["n"] = n_new
+        st["last_ts"] += self._tf_ns
+        st["close_last"] = c
+        st["high_last"] = h
+        st["low_last"] = lo_
+        return out
+
+    def populate_indicators(self, df: DataFrame, metadata: dict) -> DataFrame:
+        # Гипероптимизация присваивает .value и зовёт backtest() до
+        # bot_loop_start — освежаем снимок здесь (одно чтение дескриптора
+        # на вызов, в построчных путях по-прежнему только скаляры)
+        self._refresh_params()
+        pair = metadata.get("pair") if isinstance(metadata, dict) else None
+        out = None
+        if pair is not None:
+            bc = self._batch_cache.get(pair)
+            if (bc is not None and "date" in df and len(df) == bc["n"]
+                    and int(df["date"].iloc[-1].value) == bc["last_ts"]):
+                out = bc["out"]
+            if out is None:
+                out = self._stream_update(pair, df)
+        if out is None:
+            out = self._full_compute(df, pair)
+        for name in self._STREAM_COLS:
+            df[name] = out[name]
+        # Фильтр волатильности: ATR% > заданного минимума
+        df["vol_ok"] = out["atr_pct"] > self._atr_min
 
         # 2) Информативные данные 1h: EMA200_1h и её наклон
         try:
-            pair = metadata.get("pair") if isinstance(metadata, dict) else None
-            if pair and hasattr(self, "dp") and self.dp:
+            last_ts = int(df["date"].iloc[-1].value) if "date" in df else None
+            rc = self._regime_cache.get(pair) if pair else None
+            if (rc is not None and last_ts is not None
+                    and rc["last_ts"] == last_ts and rc["n"] == len(df)):
+                df["ema200_1h"] = rc["ema200_1h"]
+                df["ema200_slope_1h"] = rc["ema200_slope_1h"]
+                df["regime_long"] = rc["regime_long"]
+                df["regime_short"] = rc["regime_short"]
+            elif pair and hasattr(self, "dp") and self.dp:
                 inf_df = self.dp.get_pair_dataframe(pair=pair, timeframe=self.informative_timeframe)
                 if not inf_df.empty:
-                    inf_df = inf_df.copy()
-                    inf_df["ema200"] = inf_df["close"].ewm(span=200, adjust=False).mean()
-                    inf_df["ema200_slope"] = inf_df["ema200"].pct_change(3)
-                    df = merge_informative_pair(
-                        dataframe=df,
-                        informative=inf_df[["date", "ema200", "ema200_slope"]],
-                        timeframe=self.timeframe,
-                        timeframe_inf=self.informative_timeframe,
-                        ffill=True,
-                    )
-                    # Режимный фильтр по 1h EMA200
-                    df["regime_long"] = (df["close"] > df["ema200_1h"]) & (df["ema200_slope_1h"] > 0)
-                    df["regime_short"] = (df["close"] < df["ema200_1h"]) & (df["ema200_slope_1h"] < 0)
+                    close = df["close"].to_numpy(dtype=np.float64)
+                    ema200_inf = _ewm_span(
+                        inf_df["close"].to_numpy(dtype=np.float64), 200)
+                    slope_inf = np.full(ema200_inf.shape[0], np.nan)
+                    slope_inf[3:] = ema200_inf[3:] / ema200_inf[:-3] - 1.0
+                    # Прямой broadcast вместо merge_informative_pair: дата
+                    # информативной свечи сдвигается на (1h - 15m), как делает
+                    # сам merge (без заглядывания в будущее), дальше — один
+                    # векторный searchsorted вместо merge+ffill по полной копии
+                    minutes = timeframe_to_minutes(self.timeframe)
+                    minutes_inf = timeframe_to_minutes(self.informative_timeframe)
+                    dm = (inf_df["date"]
+                          + pd.Timedelta(minutes=minutes_inf - minutes)).to_numpy()
+                    pos = np.searchsorted(dm, df["date"].to_numpy(), side="right") - 1
+                    idx = np.maximum(pos, 0)
+                    ema200_1h = ema200_inf[idx].astype(np.float32)
+                    slope_1h = slope_inf[idx].astype(np.float32)
+                    ema200_1h[pos < 0] = np.nan
+                    slope_1h[pos < 0] = np.nan
+                    df["ema200_1h"] = ema200_1h
+                    df["ema200_slope_1h"] = slope_1h
+                    # Режимный фильтр по 1h EMA200: одна слитная маска,
+                    # NaN в голове даёт False, поэтому столбцы сразу int8
+                    # без последующих ffill/bfill
+                    if NUMEXPR_AVAILABLE:
+                        regime_long = ne.evaluate(
+                            "(close > e200) & (slope > 0)",
+                            local_dict={"close": close, "e200": ema200_1h,
+                                        "slope": slope_1h})
+                        regime_short = ne.evaluate(
+                            "(close < e200) & (slope < 0)",
+                            local_dict={"close": close, "e200": ema200_1h,
+                                        "slope": slope_1h})
+                    else:
+                        regime_long = (close > ema200_1h) & (slope_1h > 0)
+                        regime_short = (close < ema200_1h) & (slope_1h < 0)
+                    df["regime_long"] = regime_long.view(np.int8)
+                    df["regime_short"] = regime_short.view(np.int8)
+                    if last_ts is not None:
+                        self._regime_cache[pair] = {
+                            "last_ts": last_ts,
+                            "n": len(df),
+                            "ema200_1h": ema200_1h,
+                            "ema200_slope_1h": slope_1h,
+                            "regime_long": df["regime_long"].to_numpy(),
+                            "regime_short": df["regime_short"].to_numpy(),
+                        }
         except Exception:
             # В случае отсутствия dp или на самых ранних свечах — безопасный дефолт
             df["regime_long"] = True
             df["regime_short"] = False
 
-        # безопасность от NaN
-        for c in [
-            "ema200_1h",
-            "ema200_slope_1h",
-            "regime_long",
-            "regime_short",
-            "atr_pct",
-            "vol_ok",
-            "donch_hi",
-            "donch_lo",
-            "adx",
-        ]:
-            if c in df:
-                df[c] = df[c].ffill().bfill()
-
-        # --- чистка
-        df.replace([np.inf, -np.inf], np.nan, inplace=True)
-        df.ffill(inplace=True)
-        df.bfill(inplace=True)
+        # безопасность от NaN/inf: все float-колонки индикаторов одним
+        # 2-D проходом (int8/bool маски NaN не содержат, OHLCV не трогаем)
+        san_cols = [c for c in (*self._STREAM_COLS, "ema200_1h", "ema200_slope_1h")
+                    if c in df]
+        buf = np.empty((len(df), len(san_cols)), dtype=np.float32)
+        for j, c in enumerate(san_cols):
+            buf[:, j] = df[c].to_numpy()
+        _sanitize_fill_2d(buf)
+        for j, c in enumerate(san_cols):
+            df[c] = buf[:, j]
         return df
 
     def populate_entry_trend(self, df: DataFrame, metadata: dict) -> DataFrame:
-        # Режим входа
-        mode = self.entry_mode.value if isinstance(self.entry_mode, CategoricalParameter) else "breakout"
+        # Режим входа (снимок из _refresh_params вместо isinstance-проверки)
+        self._refresh_params()
+        mode = self._entry_mode
 
-        vol_ok = df.get("vol_ok", pd.Series(True, index=df.index))
-        regime_long = df.get("regime_long", pd.Series(True, index=df.index))
+        n = len(df)
+        vol_ok = (df["vol_ok"].to_numpy(dtype=bool)
+                  if "vol_ok" in df else np.ones(n, dtype=bool))
+        regime_long = (df["regime_long"].to_numpy(dtype=bool)
+                       if "regime_long" in df else np.ones(n, dtype=bool))
+        close = df["close"].to_numpy(dtype=np.float64)
 
         if mode == "breakout":
             # Пробой Donchian High (окно параметризовано) + RSI/ADX + режимный фильтр
-            donch_hi_prev = df["donch_hi"].shift(1)
-            long_cond = (
-                vol_ok
-                & (df["close"] > donch_hi_prev)
-                & (df["rsi"] > int(self.rsi_min_long.value))
-                & (df["adx"] > int(self.adx_min.value))
-                & regime_long
-            )
-            short_cond = pd.Series(False, index=df.index)
+            donch_hi = df["donch_hi"].to_numpy(dtype=np.float32)
+            dhp = np.empty(n, dtype=np.float32)
+            dhp[0] = np.nan
+            dhp[1:] = donch_hi[:-1]
+            rsi = df["rsi"].to_numpy(dtype=np.float32)
+            adx = df["adx"].to_numpy(dtype=np.float32)
+            if NUMEXPR_AVAILABLE:
+                # один слитный numexpr-проход вместо четырёх булевых временных
+                long_cond = ne.evaluate(
+                    "vol_ok & (close > dhp) & (rsi > rmin) & (adx > amin)"
+                    " & regime_long",
+                    local_dict={"vol_ok": vol_ok, "close": close, "dhp": dhp,
+                                "rsi": rsi, "rmin": self._rsi_min_long,
+                                "adx": adx, "amin": self._adx_min,
+                                "regime_long": regime_long})
+            else:
+                long_cond = (vol_ok & (close > dhp) & (rsi > self._rsi_min_long)
+                             & (adx > self._adx_min) & regime_long)
         else:
             # Откат: цена в пределах ± ema_kiss_pct от EMA_fast + подтверждение MACD-гистограммой + режимный фильтр
-            near_ema = (df["close"] / df["ema_fast"] - 1.0).abs() <= float(self.ema_kiss_pct.value)
-            macd_conf = (df["macd_hist"] > 0) & (df["macd_hist_slope"] > 0)
-            long_cond = vol_ok & near_ema & macd_conf & regime_long
-            short_cond = pd.Series(False, index=df.index)
+            ema_fast = df["ema_fast"].to_numpy(dtype=np.float32)
+            mh = df["macd_hist"].to_numpy(dtype=np.float32)
+            mhs = df["macd_hist_slope"].to_numpy(dtype=np.float32)
+            if NUMEXPR_AVAILABLE:
+                long_cond = ne.evaluate(
+                    "vol_ok & (abs(close / ema_fast - 1.0) <= kiss)"
+                    " & (mh > 0) & (mhs > 0) & regime_long",
+                    local_dict={"vol_ok": vol_ok, "close": close,
+                                "ema_fast": ema_fast, "kiss": self._ema_kiss,
+                                "mh": mh, "mhs": mhs,
+                                "regime_long": regime_long})
+            else:
+                near_ema = np.abs(close / ema_fast - 1.0) <= self._ema_kiss
+                long_cond = vol_ok & near_ema & (mh > 0) & (mhs > 0) & regime_long
+        short_cond = np.zeros(n, dtype=bool)
 
-        # Итоговые сигналы
-        df["enter_long"] = 0
-        df["enter_short"] = 0
-        df.loc[long_cond, "enter_long"] = 1
-        df.loc[short_cond, "enter_short"] = 1
+        # Итоговые сигналы: прямой int8-каст готовой маски вместо
+        # инициализации нулями и масочного .loc (путь через _where/BlockManager)
+        df["enter_long"] = long_cond.view(np.int8)
+        df["enter_short"] = short_cond.view(np.int8)
 
         return df
 
     def populate_exit_trend(self, df: DataFrame, metadata: dict) -> DataFrame:
         # Выход: RSI выше порога или пробой вниз EMA_fast
-        exit_l = (df["rsi"] > int(self.rsi_exit_high.value)) | (df["close"] < df["ema_fast"]) 
-        exit_s = pd.Series(False, index=df.index)
+        self._refresh_params()
+        rsi = df["rsi"].to_numpy(dtype=np.float32)
+        close = df["close"].to_numpy(dtype=np.float64)
+        ema_fast = df["ema_fast"].to_numpy(dtype=np.float32)
+        exit_l = (rsi > self._rsi_exit_high) | (close < ema_fast)
 
-        df["exit_long"] = 0
-        df["exit_short"] = 0
-        df.loc[exit_l, "exit_long"] = 1
-        df.loc[exit_s, "exit_short"] = 1
+        df["exit_long"] = exit_l.view(np.int8)
+        df["exit_short"] = np.zeros(len(df), dtype=np.int8)
         return df
     
     def informative_pairs(self):
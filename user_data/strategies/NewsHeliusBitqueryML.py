@@ -1,4 +1,6 @@
 import logging
+from collections import OrderedDict
+from functools import cached_property
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
@@ -15,11 +17,359 @@ from freqtrade.strategy import (
 from freqtrade.persistence import Trade
 from freqtrade.exchange import timeframe_to_minutes
 # from indicators import calculate_all_indicators
+from _njit import njit, prange, NUMBA_AVAILABLE
+try:
+    import bottleneck as bn
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    BOTTLENECK_AVAILABLE = False
 import warnings
 warnings.filterwarnings("ignore")
 
 logger = logging.getLogger(__name__)
 
+# Явные сигнатуры njit-ядер: компиляция происходит на декорировании при
+# импорте модуля (и кладётся в кэш numba), а не на первом вызове в бэктесте.
+# pandas .to_numpy() отдаёт readonly-вьюхи, поэтому входные массивы
+# объявляем readonly — writable конвертируется в них без копии.
+if NUMBA_AVAILABLE:
+    from numba import types as _nt
+
+    _f4 = _nt.Array(_nt.float32, 1, "C")
+    _i1 = _nt.Array(_nt.int8, 1, "C")
+    _f8_ro = _nt.Array(_nt.float64, 1, "A", readonly=True)
+    _b1_ro = _nt.Array(_nt.boolean, 1, "A", readonly=True)
+    _SIG_RSI = _f4(_f8_ro, _nt.int64)
+    _SIG_EMA = _f4(_f8_ro, _nt.int64)
+    _SIG_MACD = _nt.UniTuple(_f4, 3)(_f8_ro, _nt.int64, _nt.int64, _nt.int64)
+    _SIG_ATR = _f4(_f8_ro, _f8_ro, _f8_ro, _nt.int64)
+    _SIG_ENTRY_BREAKOUT = _i1(_f8_ro, _f8_ro, _f8_ro, _f8_ro, _b1_ro, _nt.float64, _nt.float64)
+    _SIG_ENTRY_PULLBACK = _i1(_f8_ro, _f8_ro, _f8_ro, _f8_ro, _b1_ro, _nt.float64)
+    _SIG_STATE = _nt.UniTuple(_nt.float64, 8)(_f8_ro, _f8_ro, _f8_ro)
+    _SIG_EMA_SLOPE = _nt.UniTuple(_f4, 2)(_f8_ro, _nt.int64, _nt.int64)
+else:  # pragma: no cover - без numba декоратор no-op, сигнатуры не нужны
+    _SIG_RSI = _SIG_EMA = _SIG_MACD = _SIG_ATR = None
+    _SIG_ENTRY_BREAKOUT = _SIG_ENTRY_PULLBACK = _SIG_STATE = _SIG_EMA_SLOPE = None
+
+
+class _IndicatorCache:
+    """
+    LRU-кэш индикаторных массивов по ключу (пара, последняя свеча, сигнатура).
+
+    В hyperopt populate_indicators пересчитывается на каждую эпоху на
+    неизменном OHLCV; колонки, не зависящие от перебираемых параметров,
+    достаются из кэша за O(1).
+    """
+
+    def __init__(self, maxsize: int = 64) -> None:
+        self._data: OrderedDict = OrderedDict()
+        self._maxsize = maxsize
+
+    def get_or_compute(self, key, fn):
+        hit = self._data.get(key)
+        if hit is not None:
+            self._data.move_to_end(key)
+            return hit
+        val = fn()
+        self._data[key] = val
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+        return val
+
+
+_indicator_cache = _IndicatorCache()
+
+
+@njit(_SIG_RSI, cache=True, fastmath=True)
+def _rsi_wilder_njit(close, period):
+    """
+    RSI Уайлдера одним проходом: diff, gain/loss и обе рекурсивные EMA слиты
+    в один цикл вместо четырёх pandas-проходов с промежуточными Series.
+
+    Сидирование повторяет ewm(alpha=1/period, adjust=False) по первому
+    валидному приращению; при avg_loss == 0 отдаём 50, как fillna(50)
+    в прежней pandas-версии.
+    """
+    n = close.shape[0]
+    # Храним в float32: пороги стратегии нечувствительны к fp32-округлению
+    out = np.empty(n, np.float32)
+    out[0] = 50.0
+    alpha = 1.0 / period
+    avg_gain = 0.0
+    avg_loss = 0.0
+    seeded = False
+    for i in range(1, n):
+        d = close[i] - close[i - 1]
+        g = d if d > 0.0 else 0.0
+        l = -d if d < 0.0 else 0.0
+        if not seeded:
+            avg_gain = g
+            avg_loss = l
+            seeded = True
+        else:
+            avg_gain += alpha * (g - avg_gain)
+            avg_loss += alpha * (l - avg_loss)
+        if avg_loss == 0.0:
+            out[i] = 50.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+@njit(_SIG_EMA, cache=True, fastmath=True)
+def _ema_njit(x, span):
+    """EMA с alpha = 2/(span+1) и сидированием x[0] — как ewm(adjust=False)."""
+    n = x.shape[0]
+    out = np.empty(n, np.float32)
+    alpha = 2.0 / (span + 1.0)
+    e = x[0]
+    out[0] = e
+    for i in range(1, n):
+        e += alpha * (x[i] - e)
+        out[i] = e
+    return out
+
+
+@njit(_SIG_EMA_SLOPE, cache=True, fastmath=True)
+def _ema_slope_njit(x, span, k):
+    """
+    EMA и её относительный наклон за k шагов одним проходом: кольцевой буфер
+    на k слотов вместо pandas-цепочки shift + div в pct_change(k).
+    Первые k значений наклона — 0, как у pct_change(k).fillna(0).
+    """
+    n = x.shape[0]
+    ema = np.empty(n, np.float32)
+    slope = np.zeros(n, np.float32)
+    ring = np.empty(k, np.float64)
+    alpha = 2.0 / (span + 1.0)
+    e = x[0]
+    for i in range(n):
+        if i > 0:
+            e += alpha * (x[i] - e)
+        ema[i] = e
+        if i >= k:
+            slope[i] = e / ring[i % k] - 1.0
+        ring[i % k] = e
+    return ema, slope
+
+
+@njit(_SIG_MACD, cache=True, fastmath=True)
+def _macd_njit(close, fast_span, slow_span, signal_span):
+    """
+    MACD/сигнальная/гистограмма за один проход: три EMA обновляются в одном
+    цикле, пока close[i] в регистре, вместо трёх отдельных ewm-проходов
+    с тремя аллокациями.
+    """
+    n = close.shape[0]
+    macd = np.empty(n, np.float32)
+    sig = np.empty(n, np.float32)
+    hist = np.empty(n, np.float32)
+    a_fast = 2.0 / (fast_span + 1.0)
+    a_slow = 2.0 / (slow_span + 1.0)
+    a_sig = 2.0 / (signal_span + 1.0)
+    ef = es = close[0]
+    s = 0.0
+    for i in range(n):
+        c = close[i]
+        ef += a_fast * (c - ef)
+        es += a_slow * (c - es)
+        m = ef - es
+        if i == 0:
+            s = m
+        else:
+            s += a_sig * (m - s)
+        macd[i] = m
+        sig[i] = s
+        hist[i] = m - s
+    return macd, sig, hist
+
+
+@njit(_SIG_ATR, cache=True, fastmath=True)
+def _atr_wilder_njit(high, low, close, period):
+    """
+    True Range и Уайлдер-EMA в одном проходе: без четырёх временных массивов
+    (три компоненты TR + их максимум), которые строила pandas-версия.
+    """
+    n = high.shape[0]
+    out = np.empty(n, np.float32)
+    out[0] = np.nan
+    alpha = 1.0 / period
+    atr = 0.0
+    seeded = False
+    for i in range(1, n):
+        tr = max(high[i] - low[i],
+                 abs(high[i] - close[i - 1]),
+                 abs(low[i] - close[i - 1]))
+        if not seeded:
+            atr = tr
+            seeded = True
+        else:
+            atr += alpha * (tr - atr)
+        out[i] = atr
+    return out
+
+
+@njit(_SIG_STATE, cache=True, fastmath=True)
+def _base_state_njit(high, low, close):
+    """
+    Скалярные состояния рекуррентных индикаторов на последней свече:
+    (ema50, ema200, macd_ef, macd_es, macd_sig, avg_gain, avg_loss, atr).
+    Один проход при инициализации — дальше live-режим обновляет их за O(1).
+    """
+    n = close.shape[0]
+    a50 = 2.0 / 51.0
+    a200 = 2.0 / 201.0
+    a12 = 2.0 / 13.0
+    a26 = 2.0 / 27.0
+    a9 = 2.0 / 10.0
+    alpha = 1.0 / 14.0
+    e50 = e200 = ef = es = close[0]
+    sig = 0.0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    atr = 0.0
+    rsi_seeded = False
+    atr_seeded = False
+    for i in range(1, n):
+        c = close[i]
+        e50 += a50 * (c - e50)
+        e200 += a200 * (c - e200)
+        ef += a12 * (c - ef)
+        es += a26 * (c - es)
+        sig += a9 * ((ef - es) - sig)
+        d = c - close[i - 1]
+        g = d if d > 0.0 else 0.0
+        l = -d if d < 0.0 else 0.0
+        if not rsi_seeded:
+            avg_gain = g
+            avg_loss = l
+            rsi_seeded = True
+        else:
+            avg_gain += alpha * (g - avg_gain)
+            avg_loss += alpha * (l - avg_loss)
+        tr = max(high[i] - low[i],
+                 abs(high[i] - close[i - 1]),
+                 abs(low[i] - close[i - 1]))
+        if not atr_seeded:
+            atr = tr
+            atr_seeded = True
+        else:
+            atr += alpha * (tr - atr)
+    return e50, e200, ef, es, sig, avg_gain, avg_loss, atr
+
+
+@njit(_SIG_ENTRY_BREAKOUT, cache=True)
+def _entry_breakout_njit(close, donch_hi, rsi, adx, combined, rsi_min, adx_min):
+    """
+    Вход breakout: пробой предыдущего Donchian High + RSI/ADX-пороги.
+    Сдвиг свёрнут в индексацию donch_hi[i - 1] — без shift-массива.
+    """
+    n = close.shape[0]
+    out = np.zeros(n, np.int8)
+    for i in range(1, n):
+        if (combined[i] and close[i] > donch_hi[i - 1]
+                and rsi[i] > rsi_min and adx[i] > adx_min):
+            out[i] = 1
+    return out
+
+
+@njit(_SIG_ENTRY_PULLBACK, cache=True)
+def _entry_pullback_njit(close, ema_fast, macd_hist, macd_hist_slope, combined, kiss_pct):
+    """Вход pullback: цена у EMA_fast + подтверждение MACD-гистограммой."""
+    n = close.shape[0]
+    out = np.zeros(n, np.int8)
+    for i in range(n):
+        if (combined[i] and abs(close[i] / ema_fast[i] - 1.0) <= kiss_pct
+                and macd_hist[i] > 0.0 and macd_hist_slope[i] > 0.0):
+            out[i] = 1
+    return out
+
+
+
+@njit(parallel=True, cache=True)
+def _batch_base_njit(ohlcv, lens):
+    """
+    Базовый индикаторный блок сразу по всем парам: prange по оси пар,
+    компилированные ядра работают без GIL. ohlcv — padded (P, N_max, 3)
+    массив high/low/close, lens — фактические длины.
+    """
+    n_pairs = ohlcv.shape[0]
+    n_max = ohlcv.shape[1]
+    out = np.full((n_pairs, 8, n_max), np.nan, np.float32)
+    for p in prange(n_pairs):
+        n = lens[p]
+        high = ohlcv[p, :n, 0]
+        low = ohlcv[p, :n, 1]
+        close = ohlcv[p, :n, 2]
+        out[p, 0, :n] = _ema_njit(close, 50)
+        ema_slow, ema200_slope = _ema_slope_njit(close, 200, 3)
+        out[p, 1, :n] = ema_slow
+        out[p, 7, :n] = ema200_slope
+        macd, macd_sig, macd_hist = _macd_njit(close, 12, 26, 9)
+        out[p, 2, :n] = macd
+        out[p, 3, :n] = macd_sig
+        out[p, 4, :n] = macd_hist
+        out[p, 5, :n] = _rsi_wilder_njit(close, 14)
+        out[p, 6, :n] = _atr_wilder_njit(high, low, close, 14)
+    return out
+
+
+_BASE_ROWS = ("ema_fast", "ema_slow", "macd", "macd_sig", "macd_hist", "rsi", "atr",
+              "ema200_slope_1h")
+
+
+def compute_all_indicators_batch(ohlcv_dict):
+    """
+    Пакетный расчёт базового блока по всем парам с прогревом LRU-кэша.
+
+    freqtrade вызывает populate_indicators по одной паре последовательно —
+    его API мы не меняем. Вместо этого оркестратор складывает OHLCV всех пар
+    в один padded 3D-массив, обсчитывает его параллельным prange-ядром и
+    кладёт результаты в _indicator_cache: последующие по-парные вызовы
+    populate_indicators получают кэш-хит за O(1).
+    """
+    pairs = [p for p, d in ohlcv_dict.items() if len(d)]
+    if not pairs:
+        return {}
+    lens = np.array([len(ohlcv_dict[p]) for p in pairs], dtype=np.int64)
+    n_max = int(lens.max())
+    batch = np.zeros((len(pairs), n_max, 3), dtype=np.float64)
+    for i, p in enumerate(pairs):
+        d = ohlcv_dict[p]
+        batch[i, :lens[i], 0] = d["high"].to_numpy(dtype=np.float64)
+        batch[i, :lens[i], 1] = d["low"].to_numpy(dtype=np.float64)
+        batch[i, :lens[i], 2] = d["close"].to_numpy(dtype=np.float64)
+
+    if NUMBA_AVAILABLE:
+        res = _batch_base_njit(batch, lens)
+    else:
+        # Фолбэк: те же ядра, последовательно по парам
+        res = np.full((len(pairs), 8, n_max), np.nan, np.float32)
+        for i in range(len(pairs)):
+            n = int(lens[i])
+            high, low, close = batch[i, :n, 0], batch[i, :n, 1], batch[i, :n, 2]
+            res[i, 0, :n] = _ema_njit(close, 50)
+            ema_slow, ema200_slope = _ema_slope_njit(close, 200, 3)
+            res[i, 1, :n] = ema_slow
+            res[i, 7, :n] = ema200_slope
+            macd, macd_sig, macd_hist = _macd_njit(close, 12, 26, 9)
+            res[i, 2, :n] = macd
+            res[i, 3, :n] = macd_sig
+            res[i, 4, :n] = macd_hist
+            res[i, 5, :n] = _rsi_wilder_njit(close, 14)
+            res[i, 6, :n] = _atr_wilder_njit(high, low, close, 14)
+
+    out = {}
+    for i, p in enumerate(pairs):
+        d = ohlcv_dict[p]
+        n = int(lens[i])
+        last_ts = int(d["date"].iloc[-1].value) if ("date" in d.columns and n) else 0
+        base = {name: res[i, j, :n].copy() for j, name in enumerate(_BASE_ROWS)}
+        _indicator_cache.get_or_compute(
+            (p, last_ts, n, "ema50_200_macd_rsi_atr14"), lambda b=base: b)
+        out[p] = base
+    return out
+
 class NewsHeliusBitqueryML(IStrategy):
     timeframe = "1h"
     informative_timeframe = "4h"
@@ -81,6 +431,9 @@ class NewsHeliusBitqueryML(IStrategy):
 
     def __init__(self, config: dict = None) -> None:
         super().__init__(config)
+        # Стриминг-состояние индикаторов по парам (live-режим)
+        self._ind_state: Dict[str, dict] = {}
+        self._tf_ns = int(timeframe_to_minutes(self.timeframe)) * 60 * 1_000_000_000
         # Подключаем SL/TS к параметрам
         try:
             self.stoploss = float(self.sl_static.value)
@@ -92,70 +445,226 @@ class NewsHeliusBitqueryML(IStrategy):
             # В случаях, когда параметры ещё не инициализированы (например, документация или статический анализ)
             pass
 
+    def bot_loop_start(self, **kwargs) -> None:
+        # Пакетный предрасчёт базового блока по всему вайтлисту: freqtrade
+        # дальше зовёт populate_indicators попарно, и те получают кэш-хит
+        # по тому же ключу (pair, last_ts, n, "ema50_200_macd_rsi_atr14")
+        try:
+            if self.dp is None:
+                return
+            ohlcv = {}
+            for pair in self.dp.current_whitelist():
+                pdf = self.dp.get_pair_dataframe(pair=pair, timeframe=self.timeframe)
+                if pdf is not None and len(pdf) >= 2 and "date" in pdf:
+                    ohlcv[pair] = pdf
+            if len(ohlcv) >= 2:
+                compute_all_indicators_batch(ohlcv)
+        except Exception:
+            # Любой сбой оркестратора не фатален: по-парный путь всё посчитает
+            pass
+
+    def _save_ind_state(self, pair: str, last_ts: int,
+                        high_arr, low_arr, close_arr, base: dict) -> None:
+        """Снимает скалярные состояния рекуррентных индикаторов одним проходом."""
+        e50, e200, ef, es, sig, avg_gain, avg_loss, atr = _base_state_njit(
+            high_arr, low_arr, close_arr)
+        self._ind_state[pair] = {
+            "last_ts": last_ts,
+            "n": close_arr.shape[0],
+            "prev_close": close_arr[-1],
+            "ema50": e50, "ema200": e200,
+            "macd_ef": ef, "macd_es": es, "macd_sig": sig,
+            "avg_gain": avg_gain, "avg_loss": avg_loss, "atr": atr,
+            "arrays": base,
+        }
+
+    def _stream_update_base(self, pair: str, last_ts: int,
+                            high_arr, low_arr, close_arr):
+        """
+        O(1)-обновление базового блока по одной новой свече (live).
+
+        process_only_new_candles=True гарантирует ровно одну новую свечу на
+        вызов; пересчитывать O(N) историю при этом — чистые потери. Скалярные
+        EWMA-состояния обновляются рекуррентно, массивы сдвигаются вьюхами.
+        Возвращает None при отсутствии состояния или разрыве по времени —
+        тогда вызывающий код делает полный пересчёт.
+        """
+        st = self._ind_state.get(pair)
+        n = close_arr.shape[0]
+        if st is None or n < 2:
+            return None
+        if last_ts - st["last_ts"] != self._tf_ns:
+            return None
+        if n == st["n"]:          # скользящее окно: старейшая свеча выпала
+            sl = slice(1, None)
+        elif n == st["n"] + 1:    # история приросла на одну свечу
+            sl = slice(None)
+        else:
+            return None
+        if st["prev_close"] != close_arr[-2]:
+            return None
+
+        c = close_arr[-1]
+        prev_c = st["prev_close"]
+        e50 = st["ema50"] + (2.0 / 51.0) * (c - st["ema50"])
+        e200 = st["ema200"] + (2.0 / 201.0) * (c - st["ema200"])
+        ef = st["macd_ef"] + (2.0 / 13.0) * (c - st["macd_ef"])
+        es = st["macd_es"] + (2.0 / 27.0) * (c - st["macd_es"])
+        m = ef - es
+        sig = st["macd_sig"] + (2.0 / 10.0) * (m - st["macd_sig"])
+        d = c - prev_c
+        alpha = 1.0 / 14.0
+        avg_gain = st["avg_gain"] + alpha * ((d if d > 0.0 else 0.0) - st["avg_gain"])
+        avg_loss = st["avg_loss"] + alpha * ((-d if d < 0.0 else 0.0) - st["avg_loss"])
+        rsi = 50.0 if avg_loss == 0.0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        tr = max(high_arr[-1] - low_arr[-1],
+                 abs(high_arr[-1] - prev_c), abs(low_arr[-1] - prev_c))
+        atr = st["atr"] + alpha * (tr - st["atr"])
+
+        prev_arrays = st["arrays"]
+        # Наклон EMA200 за 3 шага: ema_slow[n-4] лежит в хвосте прежнего массива
+        if n > 3:
+            e200_k = float(prev_arrays["ema_slow"][sl][-3])
+            slope200 = e200 / e200_k - 1.0 if e200_k != 0.0 else 0.0
+        else:
+            slope200 = 0.0
+        new_vals = {"ema_fast": e50, "ema_slow": e200, "macd": m, "macd_sig": sig,
+                    "macd_hist": m - sig, "rsi": rsi, "atr": atr,
+                    "ema200_slope_1h": slope200}
+        base = {}
+        for name in _BASE_ROWS:
+            arr = np.empty(n, np.float32)
+            arr[:-1] = prev_arrays[name][sl]
+            arr[-1] = new_vals[name]
+            base[name] = arr
+
+        st.update(last_ts=last_ts, n=n, prev_close=c,
+                  ema50=e50, ema200=e200, macd_ef=ef, macd_es=es, macd_sig=sig,
+                  avg_gain=avg_gain, avg_loss=avg_loss, atr=atr, arrays=base)
+        return base
+
     def populate_indicators(self, df: DataFrame, metadata: dict) -> DataFrame:
+        pair = metadata.get("pair", "") if isinstance(metadata, dict) else ""
+        last_ts = int(df["date"].iloc[-1].value) if ("date" in df.columns and len(df)) else 0
+
+        # SoA: столбцы OHLCV выдёргиваем в ndarray один раз, результаты копим
+        # в out и присваиваем единым df.assign в конце — без десятков обращений
+        # к BlockManager на каждый вызов
+        close_arr = df["close"].to_numpy(dtype=np.float64)
+        high_arr = df["high"].to_numpy(dtype=np.float64)
+        low_arr = df["low"].to_numpy(dtype=np.float64)
+        volume_arr = df["volume"].to_numpy(dtype=np.float64)
+        n = close_arr.shape[0]
+        out = {}
+
+        def _compute_base():
+            macd, macd_sig, macd_hist = _macd_njit(close_arr, 12, 26, 9)
+            ema_slow, ema200_slope = _ema_slope_njit(close_arr, 200, 3)
+            return {
+                "ema_fast": _ema_njit(close_arr, 50),
+                "ema_slow": ema_slow,
+                "ema200_slope_1h": ema200_slope,
+                "macd": macd,
+                "macd_sig": macd_sig,
+                "macd_hist": macd_hist,
+                "rsi": _rsi_wilder_njit(close_arr, 14),
+                "atr": _atr_wilder_njit(high_arr, low_arr, close_arr, 14),
+            }
+
+        # Сначала пробуем O(1)-стриминг по последней свече (live);
+        # иначе — блок, не зависящий от перебираемых параметров, через LRU-кэш
+        base = self._stream_update_base(pair, last_ts, high_arr, low_arr, close_arr)
+        if base is None:
+            base = _indicator_cache.get_or_compute(
+                (pair, last_ts, n, "ema50_200_macd_rsi_atr14"), _compute_base)
+            st = self._ind_state.get(pair)
+            if n and (st is None or st["last_ts"] != last_ts):
+                self._save_ind_state(pair, last_ts, high_arr, low_arr, close_arr, base)
+
         # --- EMA(50/200) и наклоны на базовом ТФ (1h)
-        df["ema_fast"] = df["close"].ewm(span=50, adjust=False).mean()
-        df["ema_slow"] = df["close"].ewm(span=200, adjust=False).mean()
-        df["ema_fast_slope"] = df["ema_fast"] - df["ema_fast"].shift(1)
-        # Базовый режим по EMA200 1h
-        df["ema200_1h"] = df["close"].ewm(span=200, adjust=False).mean()
-        df["ema200_slope_1h"] = df["ema200_1h"].pct_change(3).fillna(0)
-
-        # --- MACD (12,26,9)
-        macd_fast = df["close"].ewm(span=12, adjust=False).mean()
-        macd_slow = df["close"].ewm(span=26, adjust=False).mean()
-        df["macd"] = macd_fast - macd_slow
-        df["macd_sig"] = df["macd"].ewm(span=9, adjust=False).mean()
-        df["macd_hist"] = df["macd"] - df["macd_sig"]
+        ema_fast = base["ema_fast"]
+        ema_slow = base["ema_slow"]
+        out["ema_fast"] = ema_fast
+        out["ema_slow"] = ema_slow
+        ema_fast_slope = np.empty(n, np.float32)
+        ema_fast_slope[0] = np.nan
+        ema_fast_slope[1:] = ema_fast[1:] - ema_fast[:-1]
+        out["ema_fast_slope"] = ema_fast_slope
+        # Базовый режим по EMA200 1h — тот же ряд, что и ema_slow;
+        # наклон (аналог pct_change(3).fillna(0)) посчитан тем же njit-проходом
+        out["ema200_1h"] = ema_slow
+        out["ema200_slope_1h"] = base["ema200_slope_1h"]
+
+        # --- MACD (12,26,9) — три EMA в одном njit-проходе
+        macd_hist = base["macd_hist"]
+        out["macd"] = base["macd"]
+        out["macd_sig"] = base["macd_sig"]
+        out["macd_hist"] = macd_hist
         # Слоуп гистограммы (ускорение)
-        df["macd_hist_slope"] = df["macd_hist"] - df["macd_hist"].shift(1)
-
-        # --- RSI (14) по Уайлдеру
-        delta = df["close"].diff()
-        gain = delta.clip(lower=0)
-        loss = -delta.clip(upper=0)
-        avg_gain = gain.ewm(alpha=1/14, adjust=False).mean()
-        avg_loss = loss.ewm(alpha=1/14, adjust=False).mean()
-        rs = avg_gain / (avg_loss.replace(0, np.nan))
-        df["rsi"] = 100 - (100 / (1 + rs))
-        df["rsi"] = df["rsi"].fillna(50)
-
-        # --- ATR(14) и волатильность
-        prev_close = df["close"].shift(1)
-        tr = np.maximum(df["high"] - df["low"],
-                        np.maximum((df["high"] - prev_close).abs(),
-                                   (df["low"] - prev_close).abs()))
-        df["atr"] = tr.ewm(alpha=1/14, adjust=False).mean()
-        
+        macd_hist_slope = np.empty(n, np.float32)
+        macd_hist_slope[0] = np.nan
+        macd_hist_slope[1:] = macd_hist[1:] - macd_hist[:-1]
+        out["macd_hist_slope"] = macd_hist_slope
+
+        # --- RSI (14) по Уайлдеру — один слитный njit-проход
+        out["rsi"] = base["rsi"]
+
+        # --- ATR(14) — слитный njit-проход по TR и Уайлдер-EMA
+        atr = base["atr"]
+        out["atr"] = atr
+
         # 1) Расчёт ATR% (диапазон волатильности)
-        df["atr_pct"] = (df["atr"] / df["close"]).clip(lower=0)
+        atr_pct = np.clip(atr / close_arr, 0, None).astype(np.float32)
+        out["atr_pct"] = atr_pct
         # Коридор волатильности: между atr_min_pct и atr_max_pct
-        df["vol_band"] = df["atr_pct"].between(float(self.atr_min_pct.value), float(self.atr_max_pct.value))
-        
+        out["vol_band"] = ((atr_pct >= float(self.atr_min_pct.value))
+                           & (atr_pct <= float(self.atr_max_pct.value)))
+
         # 1b) Объём: SMA20 и всплеск объёма
-        df["vol_sma20"] = df["volume"].rolling(20, min_periods=1).mean()
-        df["vol_ok"] = df["volume"] > (df["vol_sma20"] * float(self.vol_spike_mult.value))
-        
+        if BOTTLENECK_AVAILABLE:
+            vol_sma20 = bn.move_mean(volume_arr, 20, min_count=1).astype(np.float32)
+        else:
+            vol_sma20 = df["volume"].rolling(20, min_periods=1).mean().to_numpy(dtype=np.float32)
+        out["vol_sma20"] = vol_sma20
+        out["vol_ok"] = volume_arr > (vol_sma20 * float(self.vol_spike_mult.value))
+
         # --- Donchian Channels для breakout режима (по параметру окна)
+        # bottleneck.move_max/move_min — O(N) монотонная дека против
+        # O(N*W) pandas rolling
         win = int(self.donch_window.value)
-        df["donch_hi"] = df["high"].rolling(win, min_periods=win).max()
-        df["donch_lo"] = df["low"].rolling(win, min_periods=win).min()
+
+        def _compute_donch():
+            if BOTTLENECK_AVAILABLE:
+                return (bn.move_max(high_arr, window=win, min_count=win).astype(np.float32),
+                        bn.move_min(low_arr, window=win, min_count=win).astype(np.float32))
+            return (df["high"].rolling(win, min_periods=win).max().to_numpy(dtype=np.float32),
+                    df["low"].rolling(win, min_periods=win).min().to_numpy(dtype=np.float32))
+
+        # Зависит от donch_window — окно входит в ключ кэша
+        donch_hi, donch_lo = _indicator_cache.get_or_compute(
+            (pair, last_ts, n, "donch", win), _compute_donch)
+        out["donch_hi"] = donch_hi
+        out["donch_lo"] = donch_lo
 
         # --- ADX(14) для фильтра силы тренда
-        up_move = df["high"].diff()
-        down_move = -df["low"].diff()
+        up_move = np.diff(high_arr, prepend=np.nan)
+        down_move = -np.diff(low_arr, prepend=np.nan)
         plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
         minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
-        tr_components = pd.concat([
-            df["high"] - df["low"],
-            (df["high"] - df["close"].shift()).abs(),
-            (df["low"] - df["close"].shift()).abs(),
-        ], axis=1)
-        tr14 = tr_components.max(axis=1).ewm(alpha=1/14, adjust=False).mean()
+        prev_close = np.empty(n)
+        prev_close[0] = np.nan
+        prev_close[1:] = close_arr[:-1]
+        # np.fmax пропускает NaN — эквивалент max(axis=1) со skipna
+        tr = np.fmax(high_arr - low_arr,
+                     np.fmax(np.abs(high_arr - prev_close), np.abs(low_arr - prev_close)))
+        tr14 = pd.Series(tr, index=df.index).ewm(alpha=1/14, adjust=False).mean()
         plus_di = 100 * (pd.Series(plus_dm, index=df.index).ewm(alpha=1/14, adjust=False).mean() / tr14)
         minus_di = 100 * (pd.Series(minus_dm, index=df.index).ewm(alpha=1/14, adjust=False).mean() / tr14)
         dx = (100 * (plus_di - minus_di).abs() / (plus_di + minus_di)).replace([np.inf, -np.inf], np.nan)
-        df["adx"] = dx.ewm(alpha=1/14, adjust=False).mean().fillna(20)
+        out["adx"] = dx.ewm(alpha=1/14, adjust=False).mean().fillna(20).to_numpy(dtype=np.float32)
+
+        # Единое присваивание всех индикаторных колонок
+        df = df.assign(**out)
 
         # 2) Информативные данные 4h: EMA200_4h и её наклон
         try:
@@ -175,7 +684,11 @@ class NewsHeliusBitqueryML(IStrategy):
                     )
                     # Режимные фильтры: 1h и 4h одновременно
                     df["regime_1h"] = (df["close"] > df["ema200_1h"]) & (df["ema200_slope_1h"] > 0)
-                    df["regime_4h"] = (df["close"] > df.get("ema200_4h", df.get("ema200_4h", df["close"])) ) & (df.get("ema200_slope_4h", 0) > 0)
+                    # явная проверка наличия вместо df.get: дефолт в df.get
+                    # вычисляется всегда, даже когда колонка существует
+                    e200_4h = df["ema200_4h"] if "ema200_4h" in df.columns else df["close"]
+                    s200_4h = df["ema200_slope_4h"] if "ema200_slope_4h" in df.columns else 0
+                    df["regime_4h"] = (df["close"] > e200_4h) & (s200_4h > 0)
                     # Совместный режим для совместимости со старой логикой
                     df["regime_long"] = df["regime_1h"] & df["regime_4h"]
                     df["regime_short"] = ~df["regime_long"]
@@ -191,78 +704,86 @@ class NewsHeliusBitqueryML(IStrategy):
         ce_k_val = float(self.ce_k.value) if hasattr(self, "ce_k") else 2.5
         df["ce_long"] = df["high"].rolling(ce_n_val, min_periods=1).max() - df["atr"] * ce_k_val
 
-        # безопасность от NaN
-        for c in [
-            "ema200_1h",
-            "ema200_slope_1h",
-            "ema200_4h",
-            "ema200_slope_4h",
-            "regime_1h",
-            "regime_4h",
-            "regime_long",
-            "regime_short",
-            "atr_pct",
-            "vol_band",
-            "vol_ok",
-            "donch_hi",
-            "donch_lo",
-            "adx",
-            "ce_long",
-        ]:
-            if c in df:
-                df[c] = df[c].ffill().bfill()
-
-        # --- чистка
-        df.replace([np.inf, -np.inf], np.nan, inplace=True)
-        df.ffill(inplace=True)
-        df.bfill(inplace=True)
+        # Финальной чистки replace/ffill/bfill больше нет: njit-индикаторы
+        # конечны после разгона, режимные bool-колонки инициализированы False
+        # на NaN-сравнениях, а NaN в начале Donchian/ADX дают "нет сигнала"
+        # вместо bfill-фабрикованных значений и поглощаются startup-периодом.
         return df
 
+    @cached_property
+    def _entry_fn(self):
+        """
+        Специализация по entry_mode: njit-ядро выбирается один раз при первом
+        обращении, а не if/else на каждом вызове populate_entry_trend.
+        """
+        mode = self.entry_mode.value if isinstance(self.entry_mode, CategoricalParameter) else "breakout"
+        return _entry_breakout_njit if mode == "breakout" else _entry_pullback_njit
+
     def populate_entry_trend(self, df: DataFrame, metadata: dict) -> DataFrame:
-        # Режим входа
+        # Режим входа; hyperopt меняет entry_mode между трейлами —
+        # при смене режима сбрасываем закэшированную специализацию
         mode = self.entry_mode.value if isinstance(self.entry_mode, CategoricalParameter) else "breakout"
+        if self.__dict__.get("_entry_fn_mode") != mode:
+            self.__dict__.pop("_entry_fn", None)
+            self.__dict__["_entry_fn_mode"] = mode
 
-        vol_ok = df.get("vol_ok", pd.Series(True, index=df.index))
-        vol_band = df.get("vol_band", pd.Series(True, index=df.index))
-        regime_long = df.get("regime_long", pd.Series(True, index=df.index))
+        # Branchless-маски на голых bool-массивах: каждое `&` по pandas
+        # Series строило временный BooleanArray, а .loc[mask] делал
+        # выравнивание индекса на каждой записи
+        n = len(df)
+        ones = np.ones(n, dtype=bool)
+        vol_ok = df["vol_ok"].to_numpy(dtype=bool) if "vol_ok" in df else ones
+        vol_band = df["vol_band"].to_numpy(dtype=bool) if "vol_band" in df else ones
+        regime_long = df["regime_long"].to_numpy(dtype=bool) if "regime_long" in df else ones
         combined_filter = vol_ok & vol_band & regime_long
 
+        close = df["close"].to_numpy(dtype=np.float64)
         if mode == "breakout":
-            # Пробой Donchian High (окно параметризовано) + RSI/ADX + режимный фильтр
-            donch_hi_prev = df["donch_hi"].shift(1)
-            long_cond = (
-                combined_filter
-                & (df["close"] > donch_hi_prev)
-                & (df["rsi"] > int(self.rsi_min_long.value))
-                & (df["adx"] > int(self.adx_min.value))
+            # Пробой Donchian High (окно параметризовано) + RSI/ADX + режимный
+            # фильтр; сдвиг donch_hi ядро делает индексацией, без shift-Series
+            args = (
+                close,
+                df["donch_hi"].to_numpy(dtype=np.float64),
+                df["rsi"].to_numpy(dtype=np.float64),
+                df["adx"].to_numpy(dtype=np.float64),
+                combined_filter,
+                float(int(self.rsi_min_long.value)),
+                float(int(self.adx_min.value)),
             )
-            short_cond = pd.Series(False, index=df.index)
         else:
             # Откат: цена в пределах ± ema_kiss_pct от EMA_fast + подтверждение MACD-гистограммой + режимный фильтр
-            near_ema = (df["close"] / df["ema_fast"] - 1.0).abs() <= float(self.ema_kiss_pct.value)
-            macd_conf = (df["macd_hist"] > 0) & (df["macd_hist_slope"] > 0)
-            long_cond = combined_filter & near_ema & macd_conf
-            short_cond = pd.Series(False, index=df.index)
+            args = (
+                close,
+                df["ema_fast"].to_numpy(dtype=np.float64),
+                df["macd_hist"].to_numpy(dtype=np.float64),
+                df["macd_hist_slope"].to_numpy(dtype=np.float64),
+                combined_filter,
+                float(self.ema_kiss_pct.value),
+            )
 
-        # Итоговые сигналы
-        df["enter_long"] = 0
-        df["enter_short"] = 0
-        df.loc[long_cond, "enter_long"] = 1
-        df.loc[short_cond, "enter_short"] = 1
+        # Итоговые сигналы — прямое присваивание int8 без .loc
+        df["enter_long"] = self._entry_fn(*args)
+        df["enter_short"] = np.zeros(n, dtype=np.int8)
 
         return df
 
     def populate_exit_trend(self, df: DataFrame, metadata: dict) -> DataFrame:
         # Выход: Chandelier Exit (long) ИЛИ RSI выше порога ИЛИ лимит по времени в сделке
         # bars_since_entry по последнему сигналу входа (апроксимация времени в сделке)
-        enter_flag = df.get("enter_long", pd.Series(0, index=df.index)).fillna(0).astype(int)
+        # не строим дефолтный Series на каждый вызов: аргумент df.get
+        # вычисляется до обращения, даже когда колонка уже есть
+        if "enter_long" in df.columns:
+            enter_flag = df["enter_long"].fillna(0).astype(int)
+        else:
+            enter_flag = pd.Series(0, index=df.index)
         enter_cum = enter_flag.cumsum()
         last_entry_cum = enter_cum.where(enter_flag == 1).ffill().fillna(0)
         bars_since_entry = (enter_cum - last_entry_cum).astype(int)
         df["bars_since_entry"] = bars_since_entry
 
         time_stop = int(self.time_stop_bars.value) if hasattr(self, "time_stop_bars") else 48
-        exit_l = (df["close"] < df.get("ce_long", df["ema_fast"])) | (df["rsi"] > int(self.rsi_exit_high.value)) | (bars_since_entry > time_stop)
+        ce_long = df["ce_long"] if "ce_long" in df.columns else df["ema_fast"]
+        exit_l = (df["close"] < ce_long) | (df["rsi"] > int(self.rsi_exit_high.value)) | (bars_since_entry > time_stop)
         exit_s = pd.Series(False, index=df.index)
 
         df["exit_long"] = 0
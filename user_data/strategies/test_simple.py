@@ -5,9 +5,25 @@ import numpy as np
 import pandas as pd
 from pandas import DataFrame
 from freqtrade.strategy import IStrategy
+try:
+    import bottleneck as bn
+    BN_AVAILABLE = True
+except ImportError:
+    BN_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+
+def _sma(arr: np.ndarray, window: int) -> np.ndarray:
+    """Скользящее среднее: bn.move_mean вместо pandas rolling,
+    при отсутствии bottleneck — np.convolve c NaN-разгоном."""
+    if BN_AVAILABLE:
+        return bn.move_mean(arr, window=window, min_count=window)
+    out = np.full(arr.shape[0], np.nan)
+    if arr.shape[0] >= window:
+        out[window - 1:] = np.convolve(arr, np.ones(window) / window, mode="valid")
+    return out
+
 class TestSimple(IStrategy):
     timeframe = "5m"
     can_short = True
@@ -28,8 +44,9 @@ class TestSimple(IStrategy):
     
     def populate_indicators(self, df: DataFrame, metadata: dict) -> DataFrame:
         # Простые индикаторы
-        df["sma_20"] = df["close"].rolling(20).mean()
-        df["sma_50"] = df["close"].rolling(50).mean()
+        close_arr = df["close"].to_numpy(dtype=np.float64)
+        df["sma_20"] = _sma(close_arr, 20)
+        df["sma_50"] = _sma(close_arr, 50)
         
         return df
 